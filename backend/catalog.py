@@ -0,0 +1,111 @@
+"""
+Player and team catalogs, built once per dataset version and served as
+pre-serialized JSON with ETags
+
+The ETag is a hash of the response bytes, so it is the same on every
+worker process and survives reloads that do not change the list; clients
+sending it back in If-None-Match get a 304 with no body.
+"""
+import hashlib
+import json
+import threading
+from bisect import bisect_left
+from fastapi import Response
+from backend.dataset_store import add_change_listener, get_store
+
+
+def encode_catalog(values):
+    """
+    JSON body and ETag of a sorted list
+    """
+    # Same encoding as FastAPI's JSONResponse
+    body = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class CatalogEntry:
+    """
+    A sorted list (or array) plus its JSON body and ETag, encoded here unless given
+    """
+
+    def __init__(self, values, body=None, etag=None):
+        self.values = values
+        if body is None:
+            body, etag = encode_catalog(values)
+        self.body = body
+        self.etag = etag
+
+    def __contains__(self, value):
+        pos = bisect_left(self.values, value)
+        return pos < len(self.values) and self.values[pos] == value
+
+
+class Catalog:
+    """
+    Sorted player and team lists of one store revision
+    """
+
+    def __init__(self, store):
+        self.version = store.version
+        self.revision = store.revision
+        if store.player_catalog is not None:
+            # Names and body mapped from the shared bundle: no per-worker copy
+            self.players = CatalogEntry(store.player_index.sorted_names, *store.player_catalog)
+        else:
+            self.players = CatalogEntry(sorted(store.player_index))
+        self.teams = CatalogEntry(sorted(store.teams))
+
+
+_catalog = None
+_catalog_store = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(store=None):
+    """
+    Catalog of store (the current store if None), rebuilt only after the data changes
+    """
+    global _catalog, _catalog_store
+    if store is None:
+        store = get_store()
+    catalog = _catalog
+    if _catalog_store is not store or catalog is None or catalog.revision != store.revision:
+        with _catalog_lock:
+            catalog = _catalog
+            if _catalog_store is not store or catalog is None or catalog.revision != store.revision:
+                catalog = Catalog(store)
+                _catalog, _catalog_store = catalog, store
+    return catalog
+
+
+def catalog_response(request, name):
+    """
+    JSON response for the "players" or "teams" catalog, 304 if the client's
+    If-None-Match already holds the current ETag
+    """
+    entry = getattr(get_catalog(), name)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _on_dataset_change(store, player_names, teams):
+    global _catalog, _catalog_store
+    if player_names is None:
+        # New store: build now, on the reload thread, not on a request
+        catalog = Catalog(store)
+        with _catalog_lock:
+            _catalog, _catalog_store = catalog, store
+        return
+    with _catalog_lock:
+        catalog = _catalog
+        # Only a catalog current up to the previous revision can be carried over
+        if _catalog_store is store and catalog is not None and catalog.revision == store.revision - 1:
+            if all(name in catalog.players for name in player_names) and all(team in catalog.teams for team in teams):
+                # Stats-only upsert: both lists are unchanged, keep serving them
+                catalog.revision = store.revision
+
+
+add_change_listener(_on_dataset_change)
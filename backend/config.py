@@ -1,8 +1,57 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 DATASET_PATH = BASE_DIR / "data" / "football_master_dataset.csv"
+DATASET_CACHE_PATH = BASE_DIR / "data" / "cache" / "football_master_dataset.feather"
+
+# Memory-map the feature matrix and index arrays so all uvicorn workers share one copy
+SHARED_FEATURE_MATRIX = os.getenv("XAI_SHARED_FEATURE_MATRIX", "0") == "1"
+SHARED_FEATURE_DIR = BASE_DIR / "data" / "cache" / "shared"
+
+# Reload the dataset in the background when the CSV changes (polling interval in seconds)
+DATASET_WATCH = os.getenv("XAI_DATASET_WATCH", "0") == "1"
+DATASET_WATCH_INTERVAL = float(os.getenv("XAI_DATASET_WATCH_INTERVAL", "5"))
+
+# Reload generation shared by all workers: POST /api/admin/reload bumps it and
+# every worker polls it (interval in seconds), so a reload reaches them all
+RELOAD_GENERATION_PATH = BASE_DIR / "data" / "cache" / "reload.generation"
+RELOAD_SYNC_INTERVAL = float(os.getenv("XAI_RELOAD_SYNC_INTERVAL", "2"))
+
+# Live player upserts, journaled so every worker applies them (polled at the
+# same interval)
+UPSERT_JOURNAL_PATH = BASE_DIR / "data" / "cache" / "upserts.jsonl"
+
+# Score every player with the performance and injury models at startup and after
+# each reload, so /predict serves a table lookup instead of calling the model
+PRECOMPUTE_PREDICTIONS = os.getenv("XAI_PRECOMPUTE_PREDICTIONS", "0") == "1"
+
+# Cache of /predict responses: "memory" (per worker LRU), "sqlite" (shared by all
+# workers on the host) or "off"; entries expire after the TTL (seconds)
+PREDICTION_CACHE_BACKEND = os.getenv("XAI_PREDICTION_CACHE", "memory")
+PREDICTION_CACHE_SIZE = int(os.getenv("XAI_PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("XAI_PREDICTION_CACHE_TTL", "600"))
+PREDICTION_CACHE_PATH = BASE_DIR / "data" / "cache" / "predictions.sqlite"
+
+# Concurrent single-player predictions arriving within the window are run as one
+# batched model (and SHAP) call; a max of 1 turns micro-batching off
+MICRO_BATCH_WINDOW_MS = float(os.getenv("XAI_MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX = int(os.getenv("XAI_MICRO_BATCH_MAX", "256"))
+
+# Inference thread pools: threads per model call, and workers for predictions
+# and (separately) SHAP explanations; keep workers * threads near the core count
+MODEL_THREADS = int(os.getenv("XAI_MODEL_THREADS", "1"))
+INFERENCE_WORKERS = int(os.getenv("XAI_INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+EXPLAIN_WORKERS = int(os.getenv("XAI_EXPLAIN_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+# Best-XI searches run for up to their time budget on their own pool; past
+# workers + queue searches in flight, new ones are refused (503)
+OPTIMIZER_WORKERS = int(os.getenv("XAI_OPTIMIZER_WORKERS", "1"))
+OPTIMIZER_QUEUE = int(os.getenv("XAI_OPTIMIZER_QUEUE", "4"))
+
+# Required in the X-Admin-Token header of /api/admin calls; unset disables them
+ADMIN_TOKEN = os.getenv("XAI_ADMIN_TOKEN")
+
 MODEL_DIR = BASE_DIR / "models"
 
 MODEL_PATHS = {
@@ -1,171 +1,146 @@
 import pandas as pd
 import numpy as np
-from backend.config import DATASET_PATH
-
-_df = None
-
-def _load_df():
-    global _df
-    if _df is None:
-        _df = pd.read_csv(DATASET_PATH)
-    return _df
+from backend import feature_engineering
+from backend.catalog import get_catalog
+from backend.dataset_store import get_store
+from backend.squads import SQUAD_SIZE, select_squads
 
 def engineer_features(df_row):
     """
     Apply feature engineering to a single player row (Series)
     Returns the enhanced row with engineered features
     """
+    store = get_store()
     row = df_row.copy() if isinstance(df_row, pd.Series) else pd.Series(df_row)
-    
-    # Handle division by zero with safe division
-    def safe_divide(numerator, denominator, default=0):
-        if denominator == 0:
-            return default
-        return numerator / denominator
-    
-    # 1. FORM FEATURES (Goals/Assists per game)
-    matches_played = row.get('matches_played', 1) or 1
-    minutes_played = row.get('minutes_played', 1) or 1
-    
-    row['goals_per_match'] = safe_divide(row.get('goals', 0), matches_played)
-    row['assists_per_match'] = safe_divide(row.get('assists', 0), matches_played)
-    row['passes_per_match'] = safe_divide(row.get('passes', 0), matches_played)
-    
-    # 2. INVOLVEMENT FEATURES
-    row['total_actions'] = row.get('goals', 0) + row.get('assists', 0) + row.get('tackles', 0)
-    row['actions_per_90'] = safe_divide(row['total_actions'] * 90, minutes_played)
-    
-    # 3. EFFICIENCY FEATURES
-    row['shot_accuracy'] = safe_divide(row.get('goals', 0), row.get('shots', 1))
-    row['pass_success_rate'] = safe_divide(
-        row.get('passes', 0),
-        row.get('passes', 0) + row.get('shots', 0) + 1
+    # Same formulas and dataset-wide workload threshold as training
+    features = feature_engineering.compute_features(
+        row.to_frame().T.infer_objects(), high_workload_threshold=store.workload_threshold
     )
-    
-    # 4. INJURY RISK FEATURES
-    row['injury_frequency'] = safe_divide(row.get('injuries_last_season', 0), matches_played)
-    row['is_injury_prone'] = 1 if row.get('injuries_last_season', 0) > 1 else 0
-    
-    # 5. EXPERIENCE & POSITION FEATURES
-    age = row.get('age', 0)
-    row['is_young'] = 1 if age < 25 else 0
-    row['is_veteran'] = 1 if age > 32 else 0
-    
-    # 6. WORKLOAD FEATURES
-    # For single row, estimate based on the value itself
-    row['high_workload'] = 1 if minutes_played > 2000 else 0  # Roughly top 25%
-    row['full_season'] = 1 if matches_played > 30 else 0
-    
-    # 7. STARTING XI INDICATOR
-    row['is_starter'] = int(row.get('is_starting_xi', 0)) if pd.notna(row.get('is_starting_xi')) else 0
-    
+    for name, values in features.items():
+        row[name] = values[0]
     return row
 
 def get_player_row(player_name: str):
     """
     Get a single player's data row with engineered features
     """
-    df = _load_df()
-    row = df[df["player_name"] == player_name]
-    if row.empty:
+    store = get_store()
+    row_id = store.row_id(player_name)
+    if row_id is None:
         return None
-    player_row = row.iloc[0]
     # Apply feature engineering to the row
-    return engineer_features(player_row)
+    return engineer_features(store.frame([row_id]).iloc[0])
+
+def get_player_features(player_name: str, feature_names: list):
+    """
+    Get a player's model input as a (1, n_features) float32 array
+    Served straight from the precomputed feature matrix (dict lookup + row slice)
+    """
+    store = get_store()
+    row_id = store.row_id(player_name)
+    if row_id is None:
+        return None
+    return store.feature_rows([row_id], feature_names)
 
 def get_players():
     """
     Get list of all unique player names
     """
-    df = _load_df()
-    return sorted(df["player_name"].dropna().unique().tolist())
+    return list(map(str, get_catalog().players.values))
 
 def get_teams():
     """
     Get list of all unique team names
     Note: Dataset uses 'team' column, not 'club_name'
     """
-    df = _load_df()
-    return sorted(df["team"].dropna().unique().tolist())
+    return list(get_catalog().teams.values)
 
 def get_team_players(team_name: str):
     """
     Get all players for a given team
     """
-    df = _load_df()
-    return df[df["team"] == team_name]
+    store = get_store()
+    return store.frame(store.team_rows(team_name))
 
 def get_players_by_names(player_names: list):
     """
     Get multiple players' data by their names
     """
-    df = _load_df()
-    return df[df["player_name"].isin(player_names)]
+    store = get_store()
+    return store.frame(store.player_rows(player_names))
 
-def get_default_squad(team_name: str, squad_size: int = 11):
+def select_players(player_names: list = None, team: str = None, position: str = None, store=None):
+    """
+    Resolve a batch selection to feature rows of store (the current store if None)
+    Players are given by name (input order) or taken from a team (sorted by
+    name); team and position then filter the selection. Each player is
+    scored on their first-occurrence row, like the single-player endpoints.
+    Returns (names, row_ids, not_found)
+    """
+    if store is None:
+        store = get_store()
+    if player_names is not None:
+        names = list(dict.fromkeys(player_names))
+        if team is not None:
+            team_names = set(store.player_names[store.team_rows(team)].tolist())
+            names = [name for name in names if name in team_names or name not in store.player_index]
+    elif team is not None:
+        names = sorted(set(store.player_names[store.team_rows(team)].tolist()))
+    else:
+        names = list(map(str, get_catalog(store).players.values))
+
+    rows = [store.player_index.get(name) for name in names]
+    not_found = [name for name, row in zip(names, rows) if row is None]
+    names = [name for name, row in zip(names, rows) if row is not None]
+    row_ids = np.array([row for row in rows if row is not None], dtype=np.intp)
+    if position is not None:
+        # An unknown position selects nothing (code -1 would match missing positions)
+        if position in store.positions:
+            keep = np.asarray(store.position_codes[row_ids]) == store.positions.index(position)
+        else:
+            keep = np.zeros(len(row_ids), dtype=bool)
+        names = [name for name, kept in zip(names, keep) if kept]
+        row_ids = row_ids[keep]
+    return names, row_ids, not_found
+
+def get_default_squad(team_name: str, squad_size: int = SQUAD_SIZE):
     """
     Get default Playing XI (11 players) for a team
     Strategy: Select best players by performance score, trying to balance positions
     Returns list of player names (no duplicates)
     """
-    df = _load_df()
-    team_df = df[df["team"] == team_name].copy()
-    
-    if team_df.empty:
-        return []
-    
-    # Remove duplicates by player_name, keep first occurrence
-    team_df = team_df.drop_duplicates(subset=["player_name"], keep="first")
-    
-    # Sort by performance score (descending)
-    team_df = team_df.sort_values("performance_score", ascending=False)
-    
-    # Try to get a balanced squad (at least 1 GK, prefer 3-4 DF, 3-4 MF, 2-3 FW)
-    # But if not enough players in certain positions, just take top performers
-    squad = []
-    position_counts = {"GK": 1, "DF": 4, "MF": 4, "FW": 2}
-    
-    # First pass: Get at least one of each position if available
-    for pos, count in position_counts.items():
-        pos_players = team_df[team_df["position"] == pos].head(count)
-        for _, player in pos_players.iterrows():
-            player_name = player["player_name"]
-            if len(squad) < squad_size and player_name not in squad:
-                squad.append(player_name)
-    
-    # Second pass: Fill remaining slots with top performers regardless of position
-    remaining = squad_size - len(squad)
-    if remaining > 0:
-        for _, player in team_df.iterrows():
-            if len(squad) >= squad_size:
-                break
-            player_name = player["player_name"]
-            if player_name not in squad:
-                squad.append(player_name)
-    
-    return squad[:squad_size]
+    store = get_store()
+    if squad_size == SQUAD_SIZE:
+        # Precomputed for every team when the store was built
+        return list(store.default_squads.get(team_name, []))
+    squads = select_squads(store, store.team_rows(team_name), squad_size)
+    return squads.get(team_name, [])
 
 def get_team_players_list(team_name: str):
     """
     Get all players for a team with their details
     Returns list of dicts with player info
     """
-    df = _load_df()
-    team_df = df[df["team"] == team_name].copy()
+    team_df = get_team_players(team_name)
     
     if team_df.empty:
         return []
     
-    players = []
-    for _, row in team_df.iterrows():
-        players.append({
-            "name": row["player_name"],
-            "position": row.get("position", "Unknown"),
-            "performance_score": float(row.get("performance_score", 0)),
-            "injury_risk": float(row.get("injury_risk", 0)),
-            "goals": int(row.get("goals", 0)),
-            "assists": int(row.get("assists", 0)),
-            "age": int(row.get("age", 0))
-        })
-    
-    return sorted(players, key=lambda x: x["performance_score"], reverse=True)
+    players = pd.DataFrame({
+        "name": team_df["player_name"],
+        "position": team_df["position"].fillna("Unknown"),
+        # Stored as float32; round away the float32 -> float64 noise
+        "performance_score": team_df["performance_score"].astype(float).round(4),
+        "injury_risk": team_df["injury_risk"].astype(float).round(4),
+        "goals": team_df["goals"].astype(int),
+        "assists": team_df["assists"].astype(int),
+        "age": team_df["age"].astype(int)
+    })
+    players = players.sort_values("performance_score", ascending=False, kind="stable")
+    return players.to_dict("records")
+
+def get_team_summary(team_name: str):
+    """
+    Get materialized team statistics (None if the team is unknown)
+    """
+    return get_store().team_aggregate(team_name)
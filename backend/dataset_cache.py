@@ -0,0 +1,162 @@
+"""
+Columnar binary cache of the dataset for fast cold start
+
+The cache is an uncompressed Arrow/Feather file holding the raw dataset plus
+every engineered feature column, so workers boot without parsing the CSV or
+recomputing features. It is rebuilt whenever the source CSV changes.
+
+Build step (run from the repository root):
+    python -m backend.dataset_cache [--force]
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from backend.config import DATASET_PATH, DATASET_CACHE_PATH
+from backend import feature_engineering
+from backend.dataset_schema import read_dataset_csv, compact_features, memory_report
+from backend.feature_engineering import ENGINEERED_FEATURES
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# Bump when the cache layout or feature definitions change
+CACHE_FORMAT = 3
+METADATA_KEY = b"xai_dataset_cache"
+
+
+def source_fingerprint(source=DATASET_PATH, with_hash=True):
+    """
+    Identify a version of the source CSV by mtime, size and (optionally) SHA-256
+    """
+    stat = source.stat()
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def fingerprint_matches(cached, source=DATASET_PATH):
+    """
+    True if a stored fingerprint still describes the source CSV
+    The cheap mtime/size check is tried first, the content hash only if it fails
+    """
+    current = source_fingerprint(source, with_hash=False)
+    if cached.get("mtime_ns") == current["mtime_ns"] and cached.get("size") == current["size"]:
+        return True
+    # Touched but possibly unchanged (e.g. fresh checkout): compare content
+    return cached.get("sha256") == source_fingerprint(source)["sha256"]
+
+
+def _read_metadata(cache_path):
+    with pa.memory_map(str(cache_path)) as source:
+        schema = pa.ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def cache_is_fresh(source=DATASET_PATH, cache_path=DATASET_CACHE_PATH):
+    """
+    True if the cache exists and was built from the current source CSV
+    """
+    if feather is None or not cache_path.exists():
+        return False
+    try:
+        meta = _read_metadata(cache_path)
+    except Exception as e:
+        print(f"Dataset cache unreadable ({e}), rebuilding")
+        return False
+    if not meta or meta.get("format") != CACHE_FORMAT:
+        return False
+    if meta.get("engineered_features") != ENGINEERED_FEATURES:
+        return False
+
+    return fingerprint_matches(meta.get("source", {}), source)
+
+
+def build_cache(source=DATASET_PATH, cache_path=DATASET_CACHE_PATH):
+    """
+    Parse the CSV, add the engineered feature columns and write the cache
+    Returns (DataFrame, workload_threshold)
+    """
+    if feather is None:
+        raise RuntimeError("pyarrow is required to build the dataset cache")
+
+    df = read_dataset_csv(source)
+    filled = feature_engineering.fill_missing(df)
+    threshold = feature_engineering.workload_threshold(filled["minutes_played"])
+    features = feature_engineering.compute_features(filled, high_workload_threshold=threshold)
+    df = df.assign(**compact_features(features))
+
+    meta = {
+        "format": CACHE_FORMAT,
+        "source": source_fingerprint(source),
+        "engineered_features": ENGINEERED_FEATURES,
+        "workload_threshold": threshold,
+    }
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(meta).encode("utf-8"),
+    })
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Workers starting together may all build the cache: each writes its own
+    # temp file and the atomic replace makes one of them win whole
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f"{cache_path.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        # Uncompressed so the file can be memory-mapped without decoding
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        tmp_path.replace(cache_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    print(f"Dataset cache written: {cache_path} ({len(df)} rows)")
+    return df, threshold
+
+
+def load_cached_dataset(source=DATASET_PATH, cache_path=DATASET_CACHE_PATH):
+    """
+    Load the dataset with engineered columns, from the cache when it is fresh
+    Rebuilds a stale cache; falls back to plain CSV if the cache cannot be used
+    Returns (DataFrame, workload_threshold); threshold is None for the CSV fallback
+    """
+    if feather is None:
+        print("pyarrow not installed, loading dataset from CSV")
+        return read_dataset_csv(source), None
+
+    if cache_is_fresh(source, cache_path):
+        table = feather.read_table(cache_path, memory_map=True)
+        meta = json.loads(table.schema.metadata[METADATA_KEY])
+        print(f"Dataset loaded from cache: {cache_path}")
+        return table.to_pandas(), meta["workload_threshold"]
+
+    try:
+        return build_cache(source, cache_path)
+    except OSError as e:
+        # e.g. read-only deployment: serve from CSV without a cache
+        print(f"Dataset cache not written ({e}), loading dataset from CSV")
+        return read_dataset_csv(source), None
+
+
+if __name__ == "__main__":
+    if "--force" in sys.argv or not cache_is_fresh():
+        build_cache()
+    else:
+        print(f"Dataset cache is up to date: {DATASET_CACHE_PATH}")
+    report = memory_report()
+    print(
+        f"Dataset memory: {report['default_dtypes_bytes'] / 1e6:.2f} MB with default dtypes, "
+        f"{report['schema_bytes'] / 1e6:.2f} MB with the declared schema ({report['saved_pct']}% smaller)"
+    )
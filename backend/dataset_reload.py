@@ -0,0 +1,193 @@
+"""
+Hot dataset reload: build a new store in the background, then swap it in
+
+The new DatasetStore (indexes, feature matrix, team aggregates, squads) is
+fully built off the request path; set_store() then replaces the reference in
+one assignment, so requests see either the old store or the new one, never a
+half-built state.
+
+Each uvicorn worker holds its own store, so a requested reload bumps a
+generation counter in a file every worker polls; each worker reloads when it
+sees a generation it has not loaded yet.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from backend.config import DATASET_PATH, RELOAD_GENERATION_PATH
+from backend.dataset_store import get_store, load_store, set_store
+
+
+def read_generation(path=RELOAD_GENERATION_PATH):
+    """
+    Current reload generation (0 before the first requested reload)
+    """
+    try:
+        return int(path.read_text(encoding="utf-8").strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_generation(path=RELOAD_GENERATION_PATH):
+    """
+    Increment the reload generation and return the new value
+    """
+    generation = read_generation(path) + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Atomic replace: pollers never read a half-written file
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(generation))
+        Path(tmp_name).replace(path)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+    return generation
+
+
+class DatasetReloader:
+    """
+    Runs at most one reload at a time, on a background thread
+    Optionally polls the dataset file and reloads when it changes
+    """
+
+    def __init__(self, path=DATASET_PATH, generation_path=RELOAD_GENERATION_PATH):
+        self.path = path
+        self.generation_path = generation_path
+        self.generation = read_generation(generation_path)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._watcher = None
+        self._syncer = None
+        self._stop = threading.Event()
+        self.last_reload = None
+        self.last_error = None
+        self.last_duration = None
+
+    @property
+    def in_progress(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def reload(self):
+        """
+        Build a new store and swap it in (blocking)
+        """
+        started = time.perf_counter()
+        try:
+            store = load_store(self.path)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Dataset reload failed: {e}")
+            raise
+        set_store(store)
+        self.last_duration = round(time.perf_counter() - started, 3)
+        self.last_reload = datetime.now().isoformat()
+        self.last_error = None
+        print(f"Dataset reloaded: {len(store)} rows (version {store.version}) in {self.last_duration}s")
+        return store
+
+    def reload_async(self):
+        """
+        Start a background reload; returns False if one is already running
+        """
+        with self._lock:
+            if self.in_progress:
+                return False
+            self._thread = threading.Thread(target=self._reload_quietly, name="dataset-reload", daemon=True)
+            self._thread.start()
+            return True
+
+    def request_reload(self):
+        """
+        Reload in every worker: bump the shared generation, then start this
+        worker's reload; returns False if one is already running here
+        """
+        with self._lock:
+            if self.in_progress:
+                return False
+            self.generation = bump_generation(self.generation_path)
+        return self.reload_async()
+
+    def _reload_quietly(self):
+        try:
+            self.reload()
+        except Exception:
+            pass  # recorded in last_error
+
+    def _signature(self):
+        stat = self.path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def start_watching(self, interval=5.0):
+        """
+        Poll the dataset file every interval seconds and reload once a
+        change has been stable for one interval
+        """
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        initial = self._signature()
+
+        def watch():
+            seen = initial
+            pending = None
+            while not self._stop.wait(interval):
+                try:
+                    current = self._signature()
+                except OSError:
+                    continue  # file is being replaced
+                if current == seen:
+                    pending = None
+                elif current != pending:
+                    # Wait one more interval so a file still being written settles
+                    pending = current
+                elif self.reload_async():
+                    print("Dataset file changed, reloading in background")
+                    seen, pending = current, None
+
+        self._watcher = threading.Thread(target=watch, name="dataset-watch", daemon=True)
+        self._watcher.start()
+        print(f"Watching {self.path} for changes every {interval}s")
+
+    def start_sync(self, interval=2.0):
+        """
+        Poll the reload generation every interval seconds and reload when
+        another worker requested a reload
+        """
+        if self._syncer is not None:
+            return
+        self._stop.clear()
+
+        def sync():
+            while not self._stop.wait(interval):
+                generation = read_generation(self.generation_path)
+                # A reload already running here may predate the request: retry next poll
+                if generation != self.generation and self.reload_async():
+                    print(f"Reload generation {generation} requested, reloading in background")
+                    self.generation = generation
+
+        self._syncer = threading.Thread(target=sync, name="dataset-sync", daemon=True)
+        self._syncer.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        self._watcher = None
+        self._syncer = None
+
+    def status(self):
+        store = get_store()
+        return {
+            "dataset_version": store.version,
+            "reload_generation": self.generation,
+            "rows": len(store),
+            "reload_in_progress": self.in_progress,
+            "watching": self._watcher is not None,
+            "last_reload": self.last_reload,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+reloader = DatasetReloader()
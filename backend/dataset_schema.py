@@ -0,0 +1,94 @@
+"""
+Declared schema for football_master_dataset.csv
+Compact dtypes for every column an endpoint uses; anything else is dropped on load
+"""
+import sys
+import numpy as np
+import pandas as pd
+from backend.config import DATASET_PATH
+
+DATASET_SCHEMA = {
+    "player_name": "object",
+    "team": "category",
+    "position": "category",
+    "age": "int16",
+    "minutes_played": "int32",
+    "matches_played": "int16",
+    "goals": "int16",
+    "assists": "int16",
+    "passes": "int32",
+    "shots": "int16",
+    "tackles": "int16",
+    "injuries_last_season": "int16",
+    # float64: team averages of these are shown rounded to 2 dp
+    "performance_score": "float64",
+    "injury_risk": "float64",
+    "is_starting_xi": "int8",
+}
+
+
+def _in_schema(column):
+    return column in DATASET_SCHEMA
+
+
+def read_dataset_csv(path=DATASET_PATH):
+    """
+    Read the CSV with the declared schema, keeping only schema columns
+    Integer columns with missing values are read as float32 instead
+    """
+    try:
+        return pd.read_csv(path, usecols=_in_schema, dtype=DATASET_SCHEMA)
+    except ValueError:
+        # Integer dtypes cannot hold NaN; fill_missing imputes them later
+        dtype = {
+            column: "float32" if kind.startswith("int") else kind
+            for column, kind in DATASET_SCHEMA.items()
+        }
+        return pd.read_csv(path, usecols=_in_schema, dtype=dtype)
+
+
+def compact_features(features):
+    """
+    Downcast engineered feature arrays: flags to int8, ratios to float32
+    """
+    compact = {}
+    for name, values in features.items():
+        values = np.asarray(values)
+        if values.dtype.kind in "iub" and values.size and values.min() >= 0 and values.max() <= 1:
+            compact[name] = values.astype(np.int8)
+        elif values.dtype.kind in "iub":
+            compact[name] = values.astype(np.int32)
+        else:
+            compact[name] = values.astype(np.float32)
+    return compact
+
+
+def frame_memory(df):
+    """
+    Bytes held by a DataFrame, string contents included
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def array_memory(values):
+    """
+    Bytes held by an array, string contents of object arrays included
+    """
+    values = np.asarray(values)
+    size = values.nbytes
+    if values.dtype == object:
+        size += sum(sys.getsizeof(value) for value in values)
+    return size
+
+
+def memory_report(path=DATASET_PATH):
+    """
+    Footprint of the dataset loaded with default dtypes vs the declared schema
+    """
+    before = frame_memory(pd.read_csv(path))
+    after = frame_memory(read_dataset_csv(path))
+    return {
+        "default_dtypes_bytes": before,
+        "schema_bytes": after,
+        "saved_pct": round(100 * (1 - after / before), 1) if before else 0.0,
+    }
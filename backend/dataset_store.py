@@ -0,0 +1,719 @@
+"""
+Single in-memory dataset store shared by every router and data_access function
+Owns the dataset, its derived indexes and a version counter
+
+The dataset is held as arrays rather than a DataFrame: player names, team and
+position codes, and one float32 matrix with every raw and engineered feature.
+That lets the arrays be memory-mapped from disk and shared read-only by all
+uvicorn workers (see backend.shared_features).
+"""
+import copy
+import hashlib
+import itertools
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from backend.config import DATASET_PATH, SHARED_FEATURE_MATRIX
+from backend import feature_engineering
+from backend.feature_engineering import ENGINEERED_FEATURES
+from backend.dataset_schema import read_dataset_csv, array_memory
+from backend.squads import select_squads
+
+# Raw numeric columns copied into the feature matrix
+BASE_FEATURES = [
+    "age", "minutes_played", "matches_played", "goals", "assists", "passes",
+    "shots", "tackles", "injuries_last_season", "performance_score",
+    "injury_risk", "is_starting_xi"
+]
+
+FEATURE_COLUMNS = BASE_FEATURES + ENGINEERED_FEATURES
+
+# Columns whose averages are shown in responses: also kept in float64, since
+# float32 storage shifts some 2-dp averages (models still read the float32 matrix)
+DISPLAY_COLUMNS = ["performance_score", "injury_risk"]
+
+# Per-team sums kept alongside the team index (means are derived from them)
+TEAM_SUM_COLUMNS = ["performance_score", "injury_risk", "goals", "assists", "is_starting_xi"]
+
+_versions = itertools.count(1)
+_store = None
+_store_lock = threading.Lock()
+_listeners = []
+
+
+class SortedNameIndex:
+    """
+    Player name -> row id lookup by binary search over a sorted names array
+    Used with memory-mapped arrays, where it needs no per-worker memory
+    """
+
+    def __init__(self, sorted_names, sorted_rows):
+        self.sorted_names = sorted_names
+        self.sorted_rows = sorted_rows
+
+    def get(self, name, default=None):
+        pos = int(np.searchsorted(self.sorted_names, name))
+        if pos < len(self.sorted_names) and self.sorted_names[pos] == name:
+            return int(self.sorted_rows[pos])
+        return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self.sorted_names)
+
+    def __iter__(self):
+        return (str(name) for name in self.sorted_names)
+
+
+class DatasetStore:
+    """
+    Dataset plus the indexes derived from it
+
+    - player_names, team_codes, position_codes: one entry per row
+      (codes index into teams / positions, -1 for missing)
+    - player_index: player name -> row id (first occurrence wins)
+    - duplicate_rows: player name -> every row id, only for names on several rows
+    - team_members: team code -> row ids of that team, in dataset order
+    - team_sums: per-team row count and sums of TEAM_SUM_COLUMNS
+    - default_squads: team name -> default Playing XI (see backend.squads)
+    - feature_matrix: contiguous float32 matrix of FEATURE_COLUMNS for every row
+    - display_matrix: float64 copy of DISPLAY_COLUMNS, the source of displayed
+      averages and squad rankings
+    - contribution_vectors: per-player match contribution sums (see
+      backend.match_features), at each player's indexed row
+    - version: increases every time a new store is built
+    - revision: increases on every live player upsert into this store
+    - player_revisions / team_revisions: revision of the last upsert that
+      touched a player / team (absent: never touched)
+
+    Players can be added or updated live (add_players / update_players); only
+    the touched rows, their teams' aggregates, squads and contribution vectors
+    are recomputed on a staged copy, then the touched rows are written and the rest swapped in.
+    Stores mapped from the shared bundle are read-only.
+    """
+
+    def __init__(self, player_names, team_codes, teams, position_codes, positions,
+                 feature_matrix, display_matrix, workload_threshold, player_index=None,
+                 team_order=None, team_offsets=None, contribution_vectors=None, player_catalog=None):
+        self.version = next(_versions)
+        self.revision = 0
+        self.player_revisions = {}
+        self.team_revisions = {}
+        self.read_only = not feature_matrix.flags.writeable
+        self._write_lock = threading.Lock()
+        self.player_names = player_names
+        self.team_codes = team_codes
+        self.teams = list(teams)
+        self.position_codes = position_codes
+        self.positions = list(positions)
+        self.feature_matrix = feature_matrix
+        self.display_matrix = display_matrix
+        self.workload_threshold = workload_threshold
+        self.feature_columns = list(FEATURE_COLUMNS)
+        self.feature_positions = {name: j for j, name in enumerate(self.feature_columns)}
+        self.display_positions = {name: j for j, name in enumerate(DISPLAY_COLUMNS)}
+        self.team_lookup = {team: code for code, team in enumerate(self.teams)}
+        self.player_index = player_index if player_index is not None else self._build_player_index()
+        self.duplicate_rows = self._build_duplicate_rows()
+        if team_order is None:
+            team_order, team_offsets = self._build_team_index()
+        # Slices of one grouped array (views, so mapped indexes stay shared)
+        self.team_members = [
+            team_order[team_offsets[code]:team_offsets[code + 1]] for code in range(len(self.teams))
+        ]
+        self.team_sums = self._build_team_sums()
+        self.default_squads = select_squads(self)
+        # Mapped from the shared bundle when there is one
+        if contribution_vectors is None:
+            from backend.match_features import contribution_vectors as build_vectors
+            contribution_vectors = build_vectors(self)
+        self.contribution_vectors = contribution_vectors
+        # (JSON body, ETag) of the sorted player names, mapped from the shared bundle
+        self.player_catalog = player_catalog
+        self._content_key = self._hash_content()
+
+    @classmethod
+    def from_frame(cls, df, workload_threshold=None):
+        """
+        Build the store from a DataFrame; engineered columns are reused when
+        present together with their workload threshold (dataset cache)
+        """
+        team_codes, teams = pd.factorize(df["team"], sort=True)
+        position_codes, positions = pd.factorize(df["position"], sort=True)
+        matrix, display, threshold = _build_feature_matrix(df, workload_threshold)
+        return cls(
+            player_names=df["player_name"].to_numpy(dtype=object),
+            team_codes=team_codes.astype(_code_dtype(len(teams))),
+            teams=teams.tolist(),
+            position_codes=position_codes.astype(_code_dtype(len(positions))),
+            positions=positions.tolist(),
+            feature_matrix=matrix,
+            display_matrix=display,
+            workload_threshold=threshold,
+        )
+
+    @classmethod
+    def from_csv(cls, path=DATASET_PATH):
+        return cls.from_frame(read_dataset_csv(path))
+
+    @classmethod
+    def from_cache(cls, path=DATASET_PATH):
+        """
+        Build the store from the columnar cache (see backend.dataset_cache)
+        Engineered columns come precomputed, so nothing is recomputed at boot
+        """
+        from backend.dataset_cache import load_cached_dataset
+        df, workload_threshold = load_cached_dataset(path)
+        return cls.from_frame(df, workload_threshold=workload_threshold)
+
+    @classmethod
+    def from_shared(cls, path=DATASET_PATH):
+        """
+        Map the feature matrix and index arrays read-only from the shared
+        bundle (see backend.shared_features), writing it first if stale
+        """
+        from backend import shared_features
+        if not shared_features.bundle_is_fresh(path):
+            shared_features.write_bundle(cls.from_cache(path), path)
+        arrays = shared_features.map_bundle()
+        return cls(
+            player_names=arrays["player_names"],
+            team_codes=arrays["team_codes"],
+            teams=arrays["teams"],
+            position_codes=arrays["position_codes"],
+            positions=arrays["positions"],
+            feature_matrix=arrays["feature_matrix"],
+            display_matrix=arrays["display_matrix"],
+            workload_threshold=arrays["workload_threshold"],
+            player_index=SortedNameIndex(arrays["sorted_names"], arrays["sorted_rows"]),
+            team_order=arrays["team_order"],
+            team_offsets=arrays["team_offsets"],
+            contribution_vectors=arrays["contribution_vectors"],
+            player_catalog=(arrays["player_catalog"].data, arrays["player_catalog_etag"]),
+        )
+
+    def __len__(self):
+        return len(self.player_names)
+
+    def memory_usage(self):
+        """
+        Bytes held by the store's arrays and indexes (mapped arrays count as 0)
+        """
+        usage = {}
+        for name in ["player_names", "team_codes", "position_codes", "feature_matrix", "display_matrix",
+                     "contribution_vectors"]:
+            values = getattr(self, name)
+            if values is not None:
+                usage[name] = 0 if isinstance(values, np.memmap) else array_memory(values)
+        if isinstance(self.player_index, dict):
+            usage["player_index"] = sys.getsizeof(self.player_index)
+        return usage
+
+    def content_key(self):
+        """
+        Hash of the data the store was built from, identical in every worker
+        process built from the same data (version is a per-process counter)
+        Upserts do not change it: they are tracked by revision and the
+        per-player / per-team revisions
+        """
+        return self._content_key
+
+    def _hash_content(self):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.feature_matrix).data)
+        digest.update(np.ascontiguousarray(self.display_matrix).data)
+        digest.update(np.ascontiguousarray(self.team_codes).data)
+        digest.update(np.ascontiguousarray(self.position_codes).data)
+        for labels in (self.player_names, self.teams, self.positions):
+            digest.update("\x1f".join(map(str, labels)).encode("utf-8"))
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+
+    def _build_player_index(self):
+        index = {}
+        for row_id, name in enumerate(self.player_names):
+            if isinstance(name, str) and name not in index:
+                index[name] = row_id
+        return index
+
+    def _build_duplicate_rows(self):
+        names = pd.Series(self.player_names, dtype=object)
+        groups = {}
+        for row_id in np.flatnonzero(names.duplicated(keep=False).to_numpy()):
+            name = names.iat[row_id]
+            if isinstance(name, str):
+                groups.setdefault(name, []).append(row_id)
+        return {name: np.asarray(rows, dtype=np.intp) for name, rows in groups.items()}
+
+    def _build_team_index(self):
+        # Stable sort keeps each team's rows in dataset order; missing teams (-1) sort first
+        order = np.argsort(self.team_codes, kind="stable").astype(np.intp)
+        counts = np.bincount(self.team_codes[self.team_codes >= 0], minlength=len(self.teams))
+        n_missing = int(np.count_nonzero(self.team_codes < 0))
+        offsets = n_missing + np.concatenate([[0], np.cumsum(counts)]).astype(np.intp)
+        return order, offsets
+
+    def _build_team_sums(self, row_ids=None):
+        # Per-team [row count, sums of TEAM_SUM_COLUMNS] over row_ids (all rows if None)
+        if row_ids is None:
+            row_ids = np.arange(len(self), dtype=np.intp)
+        codes = np.asarray(self.team_codes[row_ids])
+        valid = codes >= 0
+        codes = codes[valid]
+        rows = np.asarray(row_ids)[valid]
+        n_teams = len(self.teams)
+        sums = np.zeros((n_teams, len(TEAM_SUM_COLUMNS) + 1), dtype=np.float64)
+        sums[:, 0] = np.bincount(codes, minlength=n_teams)
+        for j, name in enumerate(TEAM_SUM_COLUMNS, start=1):
+            sums[:, j] = np.bincount(codes, weights=self.values(name)[rows], minlength=n_teams)
+        return sums
+
+    def row_id(self, player_name):
+        """
+        Row id of a player, or None if unknown
+        """
+        return self.player_index.get(player_name)
+
+    def row_ids(self, player_names):
+        """
+        Row ids of the known players among player_names, in input order
+        """
+        rows = (self.player_index.get(name) for name in player_names)
+        return np.fromiter((row for row in rows if row is not None), dtype=np.intp)
+
+    def player_rows(self, player_names):
+        """
+        Every row id of the given players, duplicates included, in dataset order
+        """
+        rows = []
+        for name in set(player_names):
+            if name in self.duplicate_rows:
+                rows.extend(self.duplicate_rows[name])
+            else:
+                row_id = self.player_index.get(name)
+                if row_id is not None:
+                    rows.append(row_id)
+        return np.sort(np.asarray(rows, dtype=np.intp))
+
+    def team_rows(self, team_name):
+        """
+        Row ids of every row of a team
+        """
+        code = self.team_lookup.get(team_name)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.team_members[code]
+
+    def team_aggregate(self, team_name):
+        """
+        Materialized team statistics, or None for an unknown team
+        """
+        code = self.team_lookup.get(team_name)
+        if code is None:
+            return None
+        rows, performance, injury_risk, goals, assists, starters = self.team_sums[code]
+        return {
+            "team": team_name,
+            "players": int(rows),
+            "avg_performance": round(float(performance / rows), 4) if rows else 0.0,
+            "avg_injury_risk": round(float(injury_risk / rows), 4) if rows else 0.0,
+            "total_goals": int(round(goals)),
+            "total_assists": int(round(assists)),
+            "num_starters": int(round(starters)),
+        }
+
+    def feature_rows(self, row_ids, feature_names):
+        """
+        Model input for the given rows as a (len(row_ids), n_features) float32 array
+        """
+        columns = [self.feature_positions[name] for name in feature_names]
+        return self.feature_matrix[np.asarray(row_ids, dtype=np.intp)[:, None], columns]
+
+    def column(self, name):
+        """
+        View of one feature matrix column
+        """
+        return self.feature_matrix[:, self.feature_positions[name]]
+
+    def values(self, name):
+        """
+        One column for aggregates and display: the float64 copy for
+        DISPLAY_COLUMNS, the feature matrix column otherwise
+        """
+        if name in self.display_positions:
+            return self.display_matrix[:, self.display_positions[name]]
+        return self.column(name)
+
+    def frame(self, row_ids=None):
+        """
+        DataFrame of the given rows (all rows if None) with the identity
+        columns and BASE_FEATURES, indexed by row id
+        """
+        if row_ids is None:
+            row_ids = np.arange(len(self), dtype=np.intp)
+        row_ids = np.asarray(row_ids, dtype=np.intp)
+        data = {
+            "player_name": np.asarray(self.player_names[row_ids], dtype=object),
+            "team": _decode(self.team_codes[row_ids], self.teams),
+            "position": _decode(self.position_codes[row_ids], self.positions),
+        }
+        # Counts are exact in float32; DISPLAY_COLUMNS come from their float64
+        # copy so averages over these frames match the CSV values
+        base = self.feature_matrix[row_ids, :len(BASE_FEATURES)].astype(np.float64)
+        for j, name in enumerate(BASE_FEATURES):
+            data[name] = base[:, j]
+        for j, name in enumerate(DISPLAY_COLUMNS):
+            data[name] = self.display_matrix[row_ids, j]
+        return pd.DataFrame(data, index=row_ids)
+
+
+    # ------------------------------------------------------------------
+    # Live player upserts
+    # ------------------------------------------------------------------
+    def add_players(self, records):
+        """
+        Append new players (dicts with player_name, team, position and every
+        BASE_FEATURES value) and return their names
+        Raises ValueError if a name already exists
+        """
+        self._check_writable()
+        with self._write_lock:
+            names = [record["player_name"] for record in records]
+            existing = [name for name in names if name in self.player_index]
+            if existing:
+                raise ValueError(f"Players already exist: {', '.join(existing)}")
+            if len(set(names)) != len(names):
+                raise ValueError("Players are repeated in the request")
+
+            n_rows, n_new = len(self), len(records)
+            staged = self._stage(n_rows + n_new)
+            rows = np.arange(n_rows, n_rows + n_new, dtype=np.intp)
+            base = np.array([[r[name] for name in BASE_FEATURES] for r in records], dtype=np.float64)
+            display = base[:, [BASE_FEATURES.index(name) for name in DISPLAY_COLUMNS]]
+            patch = staged._feature_patch(base, display)
+            patch["player_names"] = np.asarray(names, dtype=object)
+            patch["team_codes"] = np.array([staged._label_code("team", r.get("team")) for r in records])
+            patch["position_codes"] = np.array([staged._label_code("position", r.get("position")) for r in records])
+
+            teams = staged._attach_to_teams(rows, patch["team_codes"])
+            staged.team_sums += staged._view(rows, rows, patch)._build_team_sums()
+            staged._refresh_squads(teams, rows, patch)
+            patch["contribution_vectors"] = staged._contribution_patch(names, rows, patch)
+            self._commit(staged, rows, patch)
+            # Names resolve only once their rows are published
+            for row_id, name in zip(rows, names):
+                self.player_index[name] = int(row_id)
+            self._bump_revision(names, teams)
+            # Still under the write lock: listeners see upserts one at a time, in order
+            notify_change(self, names, [self.teams[code] for code in teams])
+        return names
+
+    def update_players(self, records):
+        """
+        Update existing players (dicts with player_name plus the fields to
+        change) and return their names
+        For names on several rows, the indexed (first) row is updated
+        Raises KeyError if a name is unknown, ValueError if a name is repeated
+        """
+        self._check_writable()
+        with self._write_lock:
+            names = [record["player_name"] for record in records]
+            missing = [name for name in names if name not in self.player_index]
+            if missing:
+                raise KeyError(f"Players not found: {', '.join(missing)}")
+            if len(set(names)) != len(names):
+                raise ValueError("Players are repeated in the request")
+
+            staged = self._stage(len(self))
+            rows = np.array([self.player_index[name] for name in names], dtype=np.intp)
+            base = self.feature_matrix[rows, :len(BASE_FEATURES)].astype(np.float64)
+            display = self.display_matrix[rows].copy()
+            team_codes = np.array(self.team_codes[rows])
+            position_codes = np.array(self.position_codes[rows])
+            for i, record in enumerate(records):
+                if record.get("team") is not None:
+                    team_codes[i] = staged._label_code("team", record["team"])
+                if record.get("position") is not None:
+                    position_codes[i] = staged._label_code("position", record["position"])
+                for j, name in enumerate(BASE_FEATURES):
+                    if record.get(name) is not None:
+                        base[i, j] = record[name]
+                        if name in self.display_positions:
+                            display[i, self.display_positions[name]] = record[name]
+            patch = staged._feature_patch(base, display)
+            patch["team_codes"] = team_codes
+            patch["position_codes"] = position_codes
+
+            teams = staged._attach_to_teams(rows, team_codes, old_codes=self.team_codes[rows])
+            sorted_rows = np.sort(rows)
+            staged.team_sums -= staged._view(sorted_rows)._build_team_sums()
+            staged.team_sums += staged._view(sorted_rows, rows, patch)._build_team_sums()
+            staged._refresh_squads(teams, rows, patch)
+            patch["contribution_vectors"] = staged._contribution_patch(names, rows, patch)
+            self._commit(staged, rows, patch)
+            # A name on several rows counts all of them in its contribution
+            # vector, so the teams of its other rows change as well
+            teams |= self._name_teams(names)
+            self._bump_revision(names, teams)
+            # Still under the write lock: listeners see upserts one at a time, in order
+            notify_change(self, names, [self.teams[code] for code in teams])
+        return names
+
+    def _bump_revision(self, names, team_codes):
+        # After the commit, so a revision never describes data not yet published
+        self.revision += 1
+        for name in names:
+            self.player_revisions[name] = self.revision
+        for code in team_codes:
+            self.team_revisions[self.teams[code]] = self.revision
+
+    def _name_teams(self, names):
+        # Codes of every team with a row of one of the names
+        rows = [self.duplicate_rows.get(name, [self.player_index[name]]) for name in names]
+        codes = self.team_codes[np.concatenate(rows)] if rows else []
+        return {int(code) for code in codes if code >= 0}
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError("Dataset store is memory-mapped read-only; reload the dataset instead")
+
+    def _reserve(self, n_rows):
+        # Backing buffers grow geometrically; public arrays are views of their first len(self) rows
+        if not hasattr(self, "_buffers"):
+            self._buffers = {
+                "player_names": self.player_names,
+                "team_codes": self.team_codes,
+                "position_codes": self.position_codes,
+                "feature_matrix": self.feature_matrix,
+                "display_matrix": self.display_matrix,
+                "contribution_vectors": self.contribution_vectors,
+            }
+        capacity = len(self._buffers["player_names"])
+        if n_rows <= capacity:
+            return
+        capacity = max(n_rows, 2 * capacity)
+        for name, buffer in self._buffers.items():
+            grown = np.zeros((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+            grown[:len(self)] = buffer[:len(self)]
+            self._buffers[name] = grown
+
+    def _stage(self, n_rows):
+        # Shallow copy an upsert prepares its changes on. It shares the backing
+        # buffers (rows are only written by _commit) and owns copies of the
+        # per-team and label structures; the live store is untouched until _commit
+        self._reserve(len(self))
+        staged = copy.copy(self)
+        staged._buffers = dict(self._buffers)
+        # Grows (new arrays, for the staged copy only) when n_rows exceeds the capacity
+        staged._reserve(n_rows)
+        staged._publish(n_rows)
+        staged.teams = list(self.teams)
+        staged.positions = list(self.positions)
+        staged.team_lookup = dict(self.team_lookup)
+        staged.team_members = list(self.team_members)
+        staged.team_sums = self.team_sums.copy()
+        staged.default_squads = dict(self.default_squads)
+        return staged
+
+    def _view(self, row_ids, rows=(), patch=None):
+        # Compact copy of row_ids (ascending) with the patch of rows applied,
+        # to compute what depends on an upsert before it is written
+        view = copy.copy(self)
+        view._buffers = {name: buffer[row_ids] for name, buffer in self._buffers.items()}
+        if patch:
+            local = np.searchsorted(row_ids, rows)
+            for name, values in patch.items():
+                view._buffers[name][local] = values
+        view._publish(len(row_ids))
+        return view
+
+    def _commit(self, staged, rows, patch):
+        # Publish a staged upsert: the touched rows are written (new rows into
+        # spare capacity), everything else is a reference swap. Ordered so a
+        # reader never meets a code, row id or team it cannot resolve
+        self.teams = staged.teams
+        self.positions = staged.positions
+        for name, values in patch.items():
+            staged._buffers[name][rows] = values
+        self._buffers = staged._buffers
+        self._publish(len(staged))
+        self.team_members = staged.team_members
+        self.team_sums = staged.team_sums
+        self.default_squads = staged.default_squads
+        self.team_lookup = staged.team_lookup
+
+    def _publish(self, n_rows):
+        self.player_names = self._buffers["player_names"][:n_rows]
+        self.team_codes = self._buffers["team_codes"][:n_rows]
+        self.position_codes = self._buffers["position_codes"][:n_rows]
+        self.feature_matrix = self._buffers["feature_matrix"][:n_rows]
+        self.display_matrix = self._buffers["display_matrix"][:n_rows]
+        self.contribution_vectors = self._buffers["contribution_vectors"][:n_rows]
+
+    def _label_code(self, kind, label):
+        # Code of a team / position label, registering new labels (staged copies only)
+        if label is None:
+            return -1
+        labels = self.teams if kind == "team" else self.positions
+        if label in labels:
+            return self.team_lookup[label] if kind == "team" else labels.index(label)
+        codes_name = f"{kind}_codes"
+        labels.append(label)
+        if len(labels) >= np.iinfo(self._buffers[codes_name].dtype).max:
+            # Widen the code arrays before they overflow
+            wider = _code_dtype(len(labels))
+            self._buffers[codes_name] = self._buffers[codes_name].astype(wider)
+            self._publish(len(self))
+        if kind == "team":
+            self.team_lookup[label] = len(labels) - 1
+            self.team_members.append(np.empty(0, dtype=np.intp))
+            self.team_sums = np.vstack([self.team_sums, np.zeros((1, self.team_sums.shape[1]))])
+        return len(labels) - 1
+
+    def _feature_patch(self, base, display):
+        # feature_matrix / display_matrix rows from (k, BASE_FEATURES) values,
+        # engineered with the dataset-wide threshold
+        block = {name: base[:, j] for j, name in enumerate(BASE_FEATURES)}
+        engineered = feature_engineering.compute_features(block, high_workload_threshold=self.workload_threshold)
+        matrix = np.empty((len(base), len(self.feature_columns)), dtype=np.float32)
+        matrix[:, :len(BASE_FEATURES)] = base
+        for name, values in engineered.items():
+            matrix[:, self.feature_positions[name]] = values
+        return {"feature_matrix": matrix, "display_matrix": display}
+
+    def _attach_to_teams(self, row_ids, new_codes, old_codes=None):
+        # Move each row from its old team (if any) to its new one; returns touched team codes
+        touched = set()
+        if old_codes is not None:
+            for row_id, code in zip(row_ids, old_codes):
+                if code >= 0:
+                    members = self.team_members[code]
+                    self.team_members[code] = members[members != row_id]
+                    touched.add(int(code))
+        for row_id, code in zip(row_ids, new_codes):
+            code = int(code)
+            if code >= 0:
+                members = self.team_members[code]
+                pos = np.searchsorted(members, row_id)
+                self.team_members[code] = np.insert(members, pos, row_id)
+                touched.add(code)
+        return touched
+
+    def _contribution_patch(self, names, rows, patch):
+        # Contribution vectors of the touched players (at their indexed rows,
+        # over every row of the name) with the patch applied
+        from backend.match_features import group_vectors
+        groups = [self.duplicate_rows.get(name, [row_id]) for name, row_id in zip(names, rows)]
+        row_ids = np.unique(np.concatenate(groups))
+        view = self._view(row_ids, rows, patch)
+        return group_vectors(view, [np.searchsorted(row_ids, group) for group in groups])
+
+    def _refresh_squads(self, team_codes, rows, patch):
+        # Default squads of the touched teams, from their rows with the patch applied
+        if not team_codes:
+            return
+        members = [self.team_members[code] for code in team_codes]
+        row_ids = np.unique(np.concatenate(members + [rows]))
+        squads = select_squads(self._view(row_ids, rows, patch), np.searchsorted(row_ids, np.concatenate(members)))
+        for code in team_codes:
+            team = self.teams[code]
+            if team in squads:
+                self.default_squads[team] = squads[team]
+            else:
+                self.default_squads.pop(team, None)
+
+def _code_dtype(n_labels):
+    # Smallest signed int that holds every code plus -1 for missing
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_labels < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _decode(codes, labels):
+    # Code -1 (missing) picks the trailing None
+    lookup = np.asarray(list(labels) + [None], dtype=object)
+    return lookup[codes]
+
+
+def _build_feature_matrix(df, workload_threshold=None):
+    filled = feature_engineering.fill_missing(df)
+    if workload_threshold is not None and all(name in filled for name in ENGINEERED_FEATURES):
+        # Engineered columns were precomputed (dataset cache)
+        threshold = workload_threshold
+        engineered = {}
+    else:
+        # Same preprocessing as the training pipeline, in one vectorized pass
+        threshold = feature_engineering.workload_threshold(filled["minutes_played"])
+        engineered = feature_engineering.compute_features(filled, high_workload_threshold=threshold)
+
+    matrix = np.empty((len(filled), len(FEATURE_COLUMNS)), dtype=np.float32)
+    for j, name in enumerate(FEATURE_COLUMNS):
+        if name in engineered:
+            matrix[:, j] = engineered[name]
+        else:
+            matrix[:, j] = filled[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    # Models were always fed fillna(0) inputs
+    np.nan_to_num(matrix, copy=False, nan=0.0)
+
+    display = np.column_stack([
+        filled[name].to_numpy(dtype=np.float64, na_value=np.nan) for name in DISPLAY_COLUMNS
+    ])
+    np.nan_to_num(display, copy=False, nan=0.0)
+    return np.ascontiguousarray(matrix), np.ascontiguousarray(display), threshold
+
+
+def load_store(path=DATASET_PATH):
+    """
+    Build a store the way this deployment is configured to, with the live
+    upserts of the other workers replayed (see backend.player_journal)
+    """
+    if SHARED_FEATURE_MATRIX:
+        return DatasetStore.from_shared(path)
+    from backend.player_journal import journal
+    store = DatasetStore.from_cache(path)
+    journal.replay(store)
+    return store
+
+
+def get_store():
+    """
+    Current dataset store (loaded on first use if startup did not)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = load_store()
+    return _store
+
+
+def set_store(store):
+    """
+    Make store the one every reader sees from now on
+    """
+    global _store
+    _store = store
+    notify_change(store)
+    return store
+
+
+def add_change_listener(callback):
+    """
+    Register callback(store, player_names, teams), called after the data changes
+    player_names / teams list what an upsert touched; both are None when a
+    whole new store was swapped in. Upsert callbacks run under the store's
+    write lock, so store.revision is the revision that includes the change.
+    """
+    _listeners.append(callback)
+
+
+def notify_change(store, player_names=None, teams=None):
+    for callback in list(_listeners):
+        try:
+            callback(store, player_names, teams)
+        except Exception as e:
+            print(f"Dataset change listener failed: {e}")
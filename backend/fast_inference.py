@@ -0,0 +1,148 @@
+"""
+Fast inference path: XGBoost Booster in-place prediction on float32 arrays
+
+The sklearn wrapper's predict validates and converts a DataFrame on every
+call, which for a single 17-feature row costs far more than walking the
+trees. FastPredictor skips that: feature rows are gathered from the store
+into a preallocated per-thread float32 buffer and handed straight to
+Booster.inplace_predict. Models that are not XGBoost (e.g. a v1 sklearn
+Pipeline) fall back to model.predict on a DataFrame.
+"""
+import threading
+import numpy as np
+import pandas as pd
+import xgboost
+
+# Initial rows of each thread's feature buffer (grown on demand)
+BUFFER_ROWS = 256
+
+
+def _booster(model):
+    get_booster = getattr(model, "get_booster", None)
+    if get_booster is None:
+        return None
+    try:
+        return get_booster()
+    except Exception:
+        return None
+
+
+def _iteration_range(model):
+    # Same trees as the sklearn wrapper: up to best_iteration when early stopping was used
+    try:
+        return (0, int(model.best_iteration) + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+class FastPredictor:
+    """
+    predict(X) for a model, native when the model is an XGBoost sklearn wrapper
+    """
+
+    def __init__(self, model, feature_names):
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.booster = _booster(model)
+        if self.booster is not None and self.booster.feature_names not in (None, self.feature_names):
+            # Column order must match training exactly when names are not checked
+            self.booster = None
+        self.native = self.booster is not None
+        self.iteration_range = _iteration_range(model) if self.native else None
+        self._local = threading.local()
+
+    def _buffer(self, n_rows):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or len(buffer) < n_rows:
+            buffer = np.empty((max(n_rows, BUFFER_ROWS), len(self.feature_names)), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer[:n_rows]
+
+    def predict(self, X):
+        """
+        Model output for an (n, n_features) array (or DataFrame) in feature_names order
+        """
+        if not self.native:
+            if not isinstance(X, pd.DataFrame):
+                X = pd.DataFrame(X, columns=self.feature_names)
+            return np.asarray(self.model.predict(X))
+        X = np.asarray(X, dtype=np.float32)
+        return self.booster.inplace_predict(
+            X, iteration_range=self.iteration_range, validate_features=False
+        )
+
+    def predict_rows(self, store, row_ids):
+        """
+        Model output for store rows, gathered into the thread's buffer (no DataFrame)
+        """
+        row_ids = np.asarray(row_ids, dtype=np.intp)
+        if not self.native:
+            return self.predict(store.feature_rows(row_ids, self.feature_names))
+        block = self._buffer(len(row_ids))
+        matrix = store.feature_matrix
+        columns = np.array([store.feature_positions[name] for name in self.feature_names], dtype=np.intp)
+        # One gather over the flattened matrix straight into the buffer
+        flat = (row_ids[:, None] * matrix.shape[1] + columns).ravel()
+        np.take(matrix.reshape(-1), flat, out=block.reshape(-1))
+        return self.predict(block)
+
+
+class MatchEngine:
+    """
+    Match model inference in one pass over the trees
+
+    The sklearn wrapper's predict and predict_proba each walk every tree, so
+    calling both costs two passes. For a native binary:logistic booster one
+    in-place pass gives the Team A win probability (the winner follows from
+    it), bit-identical to predict_proba. With explanations requested,
+    XGBoost's own TreeSHAP contributions are computed as well, in place of a
+    separate SHAP explainer call; they never feed the probability. Other
+    models fall back to one predict_proba call.
+    """
+
+    def __init__(self, model, feature_names):
+        self.model = model
+        self.feature_names = list(feature_names)
+        booster = _booster(model)
+        objective = getattr(model, "objective", None)
+        if booster is not None and (
+            objective != "binary:logistic"
+            or booster.feature_names not in (None, self.feature_names)
+        ):
+            booster = None
+        self.booster = booster
+        self.native = booster is not None
+        self.iteration_range = _iteration_range(model) if self.native else None
+
+    def _threads(self):
+        threads = getattr(self.model, "n_jobs", None)
+        return threads if threads and threads > 0 else -1
+
+    def infer(self, X, contributions=False):
+        """
+        Win probabilities for an (n, n_features) block of fixtures
+        Returns (team_a_win_prob, team_b_win_prob, contributions or None);
+        contributions are log-odds SHAP values, native models only
+        """
+        if not self.native:
+            if not isinstance(X, pd.DataFrame):
+                X = pd.DataFrame(X, columns=self.feature_names)
+            probabilities = np.asarray(self.model.predict_proba(X))
+            if probabilities.shape[1] > 1:
+                return probabilities[:, 1], probabilities[:, 0], None
+            return probabilities[:, 0], 1 - probabilities[:, 0], None
+
+        X = np.asarray(X, dtype=np.float32)
+        # The booster applies the logistic itself, exactly as predict_proba does
+        team_a = self.booster.inplace_predict(
+            X, iteration_range=self.iteration_range, validate_features=False
+        )
+        contribs = None
+        if contributions:
+            data = xgboost.DMatrix(X, feature_names=self.booster.feature_names, nthread=self._threads())
+            contribs = self.booster.predict(
+                data, pred_contribs=True, iteration_range=self.iteration_range, validate_features=False
+            )
+            # Drop the bias column
+            contribs = contribs[:, :-1]
+        return team_a, np.float32(1) - team_a, contribs
@@ -0,0 +1,104 @@
+"""
+Vectorized feature engineering shared by the training pipeline and the API
+Works on a DataFrame or any mapping of column name -> array, of any length
+"""
+import numpy as np
+
+# Players above this quantile of minutes played are flagged as high workload
+WORKLOAD_QUANTILE = 0.75
+
+# Columns the engineering step needs from the raw dataset
+RAW_FEATURES = [
+    "age", "minutes_played", "matches_played", "goals", "assists", "passes",
+    "shots", "tackles", "injuries_last_season", "is_starting_xi"
+]
+
+# Columns added by the engineering step, in creation order
+ENGINEERED_FEATURES = [
+    "goals_per_match", "assists_per_match", "passes_per_match", "total_actions",
+    "actions_per_90", "shot_accuracy", "pass_success_rate", "injury_frequency",
+    "is_injury_prone", "is_young", "is_veteran", "high_workload", "full_season",
+    "is_starter"
+]
+
+def fill_missing(df):
+    """
+    Fill missing numeric values with the column mean (same as training)
+    """
+    return df.fillna(df.select_dtypes(include=[np.number]).mean())
+
+def workload_threshold(minutes_played):
+    """
+    Minutes played above which a player counts as high workload
+    """
+    return float(np.nanquantile(np.asarray(minutes_played, dtype=np.float64), WORKLOAD_QUANTILE))
+
+def _column(block, name):
+    values = np.asarray(block[name])
+    # Widen compact dtypes (int16, float32) so the arithmetic cannot overflow
+    if values.dtype.kind in "iub":
+        return values.astype(np.int64)
+    return values.astype(np.float64)
+
+def compute_features(block, high_workload_threshold=None):
+    """
+    Compute every engineered feature for a block of players in one pass
+    Returns a dict of feature name -> numpy array, ordered as ENGINEERED_FEATURES
+
+    high_workload_threshold should be the threshold of the full dataset when
+    scoring a subset, so results match the training pipeline exactly
+    """
+    goals = _column(block, "goals")
+    assists = _column(block, "assists")
+    passes = _column(block, "passes")
+    shots = _column(block, "shots")
+    tackles = _column(block, "tackles")
+    injuries = _column(block, "injuries_last_season")
+    age = _column(block, "age")
+    matches_played = _column(block, "matches_played")
+    minutes_played = _column(block, "minutes_played")
+
+    if high_workload_threshold is None:
+        high_workload_threshold = workload_threshold(minutes_played)
+
+    features = {}
+
+    # 1. FORM FEATURES (Goals/Assists per game)
+    features["goals_per_match"] = goals / (matches_played + 1)
+    features["assists_per_match"] = assists / (matches_played + 1)
+    features["passes_per_match"] = passes / (matches_played + 1)
+
+    # 2. INVOLVEMENT FEATURES
+    features["total_actions"] = goals + assists + tackles
+    features["actions_per_90"] = (features["total_actions"] * 90) / (minutes_played + 1)
+
+    # 3. EFFICIENCY FEATURES
+    features["shot_accuracy"] = goals / (shots + 1)
+    features["pass_success_rate"] = passes / (passes + shots + 1)
+
+    # 4. INJURY RISK FEATURES
+    features["injury_frequency"] = injuries / (matches_played + 1)
+    features["is_injury_prone"] = (injuries > 1).astype(int)
+
+    # 5. EXPERIENCE & POSITION FEATURES
+    features["is_young"] = (age < 25).astype(int)
+    features["is_veteran"] = (age > 32).astype(int)
+
+    # 6. WORKLOAD FEATURES
+    features["high_workload"] = (minutes_played > high_workload_threshold).astype(int)
+    features["full_season"] = (matches_played > 30).astype(int)
+
+    # 7. STARTING XI INDICATOR
+    features["is_starter"] = _column(block, "is_starting_xi").astype(int)
+
+    return features
+
+def engineer_features(df, high_workload_threshold=None):
+    """
+    Create enhanced features for better predictions
+    Returns a copy of df with the ENGINEERED_FEATURES columns added
+    """
+    df_enhanced = df.copy()
+    for name, values in compute_features(df, high_workload_threshold).items():
+        df_enhanced[name] = values
+    return df_enhanced
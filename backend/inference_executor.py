@@ -0,0 +1,85 @@
+"""
+Dedicated thread pools for model inference
+
+The models were trained with n_jobs=-1, so left alone every predict call
+tries to use every core and concurrent requests oversubscribe the CPU.
+Instead each model is pinned to XAI_MODEL_THREADS threads and calls run
+on bounded pools:
+
+- predict pool (XAI_INFERENCE_WORKERS): cheap model.predict / predict_proba
+- explain pool (XAI_EXPLAIN_WORKERS): expensive SHAP explanations, kept
+  apart so they cannot queue in front of predictions
+- optimizer pool (XAI_OPTIMIZER_WORKERS): best-XI searches, which run for
+  their whole time budget; bounded by XAI_OPTIMIZER_QUEUE waiting searches
+
+Worst-case CPU use is (predict + explain + optimizer workers) * model threads.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import (
+    INFERENCE_WORKERS, EXPLAIN_WORKERS, MODEL_THREADS, OPTIMIZER_WORKERS, OPTIMIZER_QUEUE
+)
+
+predict_pool = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+explain_pool = ThreadPoolExecutor(max_workers=EXPLAIN_WORKERS, thread_name_prefix="explain")
+optimizer_pool = ThreadPoolExecutor(max_workers=OPTIMIZER_WORKERS, thread_name_prefix="optimizer")
+# Searches running or waiting on the optimizer pool
+_optimizer_slots = threading.BoundedSemaphore(OPTIMIZER_WORKERS + OPTIMIZER_QUEUE)
+
+
+class PoolFull(RuntimeError):
+    """
+    Raised when a bounded pool has no room for another call
+    """
+
+
+def set_model_threads(model, threads=MODEL_THREADS):
+    """
+    Limit the threads one predict call of a model may use
+    (n_jobs on the sklearn wrapper, which also sets the booster's nthread)
+    """
+    if hasattr(model, "set_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=threads)
+    return model
+
+
+def run_inference(fn, *args, **kwargs):
+    """
+    Run a model call on the predict pool and wait for it
+    (async handlers pass predict_pool to their MicroBatcher instead)
+    """
+    return predict_pool.submit(fn, *args, **kwargs).result()
+
+
+def run_explanation(fn, *args, **kwargs):
+    """
+    Run a SHAP call on the explain pool and wait for it
+    """
+    return explain_pool.submit(fn, *args, **kwargs).result()
+
+
+def run_optimization(fn, *args, **kwargs):
+    """
+    Run a search on the optimizer pool and wait for it
+    Raises PoolFull if XAI_OPTIMIZER_WORKERS + XAI_OPTIMIZER_QUEUE searches
+    are already in flight
+    """
+    if not _optimizer_slots.acquire(blocking=False):
+        raise PoolFull("Optimizer is busy, retry later")
+    try:
+        return optimizer_pool.submit(fn, *args, **kwargs).result()
+    finally:
+        _optimizer_slots.release()
+
+
+def status():
+    return {
+        "model_threads": MODEL_THREADS,
+        "predict_workers": INFERENCE_WORKERS,
+        "explain_workers": EXPLAIN_WORKERS,
+        "optimizer_workers": OPTIMIZER_WORKERS,
+        "predict_queue": predict_pool._work_queue.qsize(),
+        "explain_queue": explain_pool._work_queue.qsize(),
+        "optimizer_queue": optimizer_pool._work_queue.qsize(),
+    }
+
@@ -0,0 +1,51 @@
+"""
+Monte Carlo simulation of a single-elimination (knockout) bracket
+
+Entries are listed in bracket order: 1 plays 2, 3 plays 4, and so on, and
+winners meet in the same order in the next round. Cup ties are taken as
+played on neutral ground, so P(i beats j) averages the model's probability
+with i as Team A and with i as Team B; the matrix comes from the shared
+pairing matrix cache. Every round of every simulated bracket is sampled
+with NumPy at once.
+"""
+import numpy as np
+
+
+def neutral_matrix(pairing):
+    """
+    (n, n) P(i beats j) on neutral ground from a pairing_matrix (rows = Team A)
+    Rows and columns of two teams sum to 1
+    """
+    neutral = (pairing + (1 - pairing.T)) / 2
+    np.fill_diagonal(neutral, 0.5)
+    return neutral.astype(np.float32)
+
+
+def round_names(n_entries):
+    """
+    Stage reached at each round of an n_entries bracket, ending with "winner"
+    """
+    names = []
+    remaining = n_entries
+    while remaining > 1:
+        names.append({2: "final", 4: "semi_final", 8: "quarter_final"}.get(remaining, f"round_of_{remaining}"))
+        remaining //= 2
+    return names + ["winner"]
+
+
+def simulate_bracket(neutral, simulations, seed=None):
+    """
+    Simulate the bracket; neutral is (n, n) with n a power of two, in bracket order
+    Returns an (n_rounds + 1, n) array: probability of each entry reaching each
+    stage of round_names(n)
+    """
+    n = len(neutral)
+    rng = np.random.default_rng(seed)
+    slots = np.tile(np.arange(n, dtype=np.intp), (simulations, 1))
+    reached = [np.ones(n)]
+    while slots.shape[1] > 1:
+        home, away = slots[:, 0::2], slots[:, 1::2]
+        home_wins = rng.random(home.shape, dtype=np.float32) < neutral[home, away]
+        slots = np.where(home_wins, home, away)
+        reached.append(np.bincount(slots.ravel(), minlength=n) / simulations)
+    return np.vstack(reached)
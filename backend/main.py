@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import performance, injury, match
+from backend.routers import performance, injury, match, admin, players
 from backend.utils.load_models import load_all_models
+from backend.config import DATASET_WATCH, DATASET_WATCH_INTERVAL, RELOAD_SYNC_INTERVAL
+from backend.dataset_reload import reloader
+from backend.player_journal import journal
 
 app = FastAPI(
     title="Football XAI API",
@@ -22,11 +25,22 @@ app.add_middleware(
 app.include_router(performance.router, prefix="/api/performance", tags=["Performance"])
 app.include_router(injury.router, prefix="/api/injury", tags=["Injury"])
 app.include_router(match.router, prefix="/api/match", tags=["Match"])
+app.include_router(players.router, prefix="/api/players", tags=["Players"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 # Load models on startup
 @app.on_event("startup")
 async def startup_event():
     load_all_models(app)
+    reloader.start_sync(RELOAD_SYNC_INTERVAL)
+    journal.start_sync(RELOAD_SYNC_INTERVAL)
+    if DATASET_WATCH:
+        reloader.start_watching(DATASET_WATCH_INTERVAL)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    reloader.stop_watching()
+    journal.stop_sync()
 
 @app.get("/")
 def root():
@@ -0,0 +1,241 @@
+"""
+Team-vs-team feature matrix for the match model, for many fixtures at once
+
+Each side's statistics are aggregated over every dataset row of its players
+(duplicates included, as get_players_by_names returns them). Every team
+statistic is a sum (means are sums over a row count), so each player's
+contribution is precomputed once as a small vector of sums and a squad's
+feature row is the sum of its 11 vectors. Swapping one player is then a
+subtract and an add on a cached squad vector.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from backend.dataset_store import add_change_listener
+
+# Model input columns, in training order
+MATCH_FEATURES = [
+    "team_a_performance", "team_a_injury_risk", "team_a_goals", "team_a_starters",
+    "team_a_goals_per_match",
+    "team_b_performance", "team_b_injury_risk", "team_b_goals", "team_b_starters",
+    "team_b_goals_per_match",
+]
+
+# Sums making up a player's contribution vector
+CONTRIBUTIONS = ["rows", "performance", "injury_risk", "goals", "assists", "passes", "starters", "played"]
+
+# Squad vectors kept for swap-one updates
+SQUAD_CACHE_SIZE = 1024
+
+
+def _row_vectors(store, row_ids):
+    """
+    (len(row_ids), len(CONTRIBUTIONS)) float64 contribution of single rows
+    """
+    def column(name):
+        return store.values(name)[row_ids].astype(np.float64)
+
+    return np.column_stack([
+        np.ones(len(row_ids)),
+        column("performance_score"),
+        column("injury_risk"),
+        column("goals"),
+        column("assists"),
+        column("passes"),
+        column("is_starting_xi") == 1,
+        column("matches_played") > 0,
+    ])
+
+
+def contribution_vectors(store):
+    """
+    (len(store), len(CONTRIBUTIONS)) float64 contribution of every player
+    (sums over all of their rows), stored at the player's first row id
+    """
+    vectors = _row_vectors(store, np.arange(len(store), dtype=np.intp))
+    for name, rows in store.duplicate_rows.items():
+        vectors[store.row_id(name)] = vectors[rows].sum(axis=0)
+    return vectors
+
+
+def group_vectors(store, groups):
+    """
+    (len(groups), len(CONTRIBUTIONS)) float64 contribution of each group of
+    row ids (one player's rows), summed
+    """
+    totals = np.zeros((len(groups), len(CONTRIBUTIONS)))
+    for i, rows in enumerate(groups):
+        totals[i] = _row_vectors(store, np.asarray(rows, dtype=np.intp)).sum(axis=0)
+    return totals
+
+
+class PlayerContributions:
+    """
+    The store's contribution vectors plus an LRU of squad vectors
+    Upserts rewrite the touched vectors before their revision is published
+    (DatasetStore._commit), so squad vectors keyed by revision stay valid
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._squads = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def vectors(self):
+        return self.store.contribution_vectors
+
+    def clear(self):
+        """
+        Drop the cached squad vectors (after an upsert)
+        """
+        with self._lock:
+            self._squads.clear()
+
+    def _ids(self, names):
+        # Each player counts once, unknown names count as nothing
+        rows = (self.store.row_id(name) for name in dict.fromkeys(names))
+        return np.fromiter((row for row in rows if row is not None), dtype=np.intp)
+
+    def side_vectors(self, sides):
+        """
+        (len(sides), len(CONTRIBUTIONS)) summed vectors, for a list of player-name lists
+        """
+        ids = [self._ids(names) for names in sides]
+        group = np.repeat(np.arange(len(sides)), [len(side) for side in ids])
+        flat = np.concatenate(ids) if ids else np.empty(0, dtype=np.intp)
+        totals = np.zeros((len(sides), len(CONTRIBUTIONS)))
+        np.add.at(totals, group, self.vectors[flat])
+        return totals
+
+    def squad_vector(self, names):
+        """
+        Summed vector of one squad, cached by its (unordered) player set
+        """
+        key = self._key(names)
+        with self._lock:
+            vector = self._squads.get(key)
+            if vector is not None:
+                self._squads.move_to_end(key)
+                return vector
+        vector = self.side_vectors([names])[0]
+        self._remember(key, vector)
+        return vector
+
+    def swap(self, names, player_out, player_in):
+        """
+        Vector of the squad with player_out replaced by player_in, in constant
+        time from the cached vector of the current squad
+        Returns (new squad names, new vector)
+        """
+        new_names = [player_in if name == player_out else name for name in names]
+        vector = (self.squad_vector(names)
+                  - self.vectors[self.store.row_id(player_out)]
+                  + self.vectors[self.store.row_id(player_in)])
+        if not np.isfinite(vector).all():
+            # A NaN/inf cannot be subtracted back out; sum the new squad instead
+            vector = self.side_vectors([new_names])[0]
+        self._remember(self._key(new_names), vector)
+        return new_names, vector
+
+    def _key(self, names):
+        # Tagged with the revision so a vector from before an upsert is never reused
+        return self.store.revision, frozenset(names)
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._squads[key] = vector
+            self._squads.move_to_end(key)
+            while len(self._squads) > SQUAD_CACHE_SIZE:
+                self._squads.popitem(last=False)
+
+
+_contributions = None
+_contributions_lock = threading.Lock()
+
+
+def get_contributions(store):
+    """
+    Contribution vectors of a store, built on first use
+    """
+    global _contributions
+    contributions = _contributions
+    if contributions is None or contributions.store is not store:
+        with _contributions_lock:
+            contributions = _contributions
+            if contributions is None or contributions.store is not store:
+                contributions = PlayerContributions(store)
+                _contributions = contributions
+    return contributions
+
+
+def stats_from_vectors(vectors):
+    """
+    Team statistics from summed contribution vectors, one entry per side
+    """
+    columns = dict(zip(CONTRIBUTIONS, np.asarray(vectors, dtype=np.float64).T))
+    players = np.maximum(columns["rows"], 1)
+    return {
+        "rows": columns["rows"].astype(np.int64),
+        "performance": columns["performance"] / players,
+        "injury_risk": columns["injury_risk"] / players,
+        "goals": columns["goals"],
+        "assists": columns["assists"],
+        "passes": columns["passes"],
+        "starters": columns["starters"],
+        "goals_per_match": columns["goals"] / np.maximum(columns["played"], 1),
+    }
+
+
+def side_stats(store, sides):
+    """
+    Aggregate statistics of each side, for a list of player-name lists
+    Returns a dict of column -> array with one entry per side
+    """
+    return stats_from_vectors(get_contributions(store).side_vectors(sides))
+
+
+def feature_frame(stats_a, stats_b):
+    """
+    Model input (MATCH_FEATURES columns) from the stats of the A and B sides
+    """
+    X = pd.DataFrame({
+        "team_a_performance": stats_a["performance"],
+        "team_a_injury_risk": stats_a["injury_risk"],
+        "team_a_goals": stats_a["goals"],
+        "team_a_starters": stats_a["starters"],
+        "team_a_goals_per_match": stats_a["goals_per_match"],
+        "team_b_performance": stats_b["performance"],
+        "team_b_injury_risk": stats_b["injury_risk"],
+        "team_b_goals": stats_b["goals"],
+        "team_b_starters": stats_b["starters"],
+        "team_b_goals_per_match": stats_b["goals_per_match"],
+    }, columns=MATCH_FEATURES)
+    return X.fillna(0)
+
+
+def build_match_features(store, fixtures):
+    """
+    Model input for a list of (team_a names, team_b names) fixtures
+    Returns (X with MATCH_FEATURES columns, stats of the A sides, stats of the B sides)
+    """
+    stats = side_stats(store, [side for fixture in fixtures for side in fixture])
+    stats_a = {name: values[0::2] for name, values in stats.items()}
+    stats_b = {name: values[1::2] for name, values in stats.items()}
+    return feature_frame(stats_a, stats_b), stats_a, stats_b
+
+
+def _on_dataset_change(store, player_names, teams):
+    global _contributions
+    if player_names is None:
+        contributions = PlayerContributions(store)
+        with _contributions_lock:
+            _contributions = contributions
+        return
+    contributions = _contributions
+    if contributions is not None and contributions.store is store:
+        contributions.clear()
+
+
+add_change_listener(_on_dataset_change)
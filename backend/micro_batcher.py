@@ -0,0 +1,109 @@
+"""
+Dynamic micro-batching of concurrent single-row model calls
+
+Requests that arrive within a short window (XAI_MICRO_BATCH_WINDOW_MS) are
+stacked into one block; the model (or SHAP explainer) runs once on the
+block in a worker thread and each caller's future gets its own row's
+result. A batch is flushed early once it reaches XAI_MICRO_BATCH_MAX rows;
+XAI_MICRO_BATCH_MAX=1 turns batching off (each call still runs off the
+event loop).
+"""
+import asyncio
+import numpy as np
+import pandas as pd
+from backend.utils.shap_helpers import explain_rows
+
+
+class MicroBatcher:
+    """
+    Collects (1, n_features) rows and resolves each with fn's result for it
+    fn takes an (n, n_features) array and returns a sequence of n results
+    """
+
+    def __init__(self, fn, window_ms=2.0, max_batch=256, executor=None):
+        self.fn = fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.executor = executor
+        self._pending = []
+        self._timer = None
+        # Running batch tasks: the event loop only keeps weak references
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, row):
+        """
+        Queue one row and wait for its result
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Micro-batch task failed: {task.exception()}")
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            block = np.concatenate([row for row, _ in batch])
+            # Off the event loop, so new requests keep queueing meanwhile
+            results = await loop.run_in_executor(self.executor, self.fn, block)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+
+def prediction_batcher(predictor, **options):
+    """
+    Batcher resolving each row with the model's prediction for it (a float)
+    predictor is a backend.fast_inference.FastPredictor
+    """
+    def predict(block):
+        return predictor.predict(block).tolist()
+    return MicroBatcher(predict, **options)
+
+
+def explanation_batcher(explainer, feature_names, top_k=5, **options):
+    """
+    Batcher resolving each row with its SHAP explanation dict
+    """
+    def explain(block):
+        return explain_rows(explainer, pd.DataFrame(block, columns=feature_names), feature_names, top_k)
+    return MicroBatcher(explain, **options)
@@ -0,0 +1,157 @@
+"""
+Journal of live player upserts, applied by every uvicorn worker
+
+Each worker holds its own store, so an upsert is appended to a JSON-lines
+file next to the dataset cache: the worker serving the request applies it at
+once, the others at their next poll (the file growing is the signal). Entries
+are applied in file order, under a file lock, so every worker ends up with the
+same rows.
+
+The journal belongs to one version of the source CSV (its first line holds the
+CSV fingerprint). Stores built from that CSV replay it on load, so a restarted
+worker catches up too. Once the CSV changes, the first upsert against the new
+data starts a new journal and the old upserts go away with the old data.
+"""
+import json
+import threading
+import weakref
+from contextlib import contextmanager
+from backend.config import DATASET_PATH, UPSERT_JOURNAL_PATH
+from backend.dataset_cache import source_fingerprint, fingerprint_matches
+from backend.dataset_store import get_store
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process file lock (e.g. Windows): run a single worker there
+    fcntl = None
+
+OPERATIONS = ("add_players", "update_players")
+
+
+class PlayerJournal:
+    """
+    Appends upserts and applies new entries to this worker's store
+    """
+
+    def __init__(self, path=UPSERT_JOURNAL_PATH, source=DATASET_PATH):
+        self.path = path
+        self.source = source
+        self._lock = threading.Lock()
+        # store -> (sha256 of the CSV it was built from, journal bytes applied)
+        self._applied = weakref.WeakKeyDictionary()
+        self._syncer = None
+        self._stop = threading.Event()
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _header(f):
+        # Source sha256 the journal belongs to, and where its entries start
+        f.seek(0)
+        line = f.readline()
+        if not line.endswith(b"\n"):
+            return None, 0
+        return json.loads(line)["source"].get("sha256"), len(line)
+
+    def replay(self, store):
+        """
+        Apply the journal to a store just built from the source CSV
+        """
+        if store.read_only:
+            return
+        self._applied[store] = (source_fingerprint(self.source)["sha256"], 0)
+        if not self.path.exists():
+            return
+        with self._locked() as f:
+            self._catch_up(store, f)
+
+    def _catch_up(self, store, f):
+        sha, offset = self._applied[store]
+        journal_sha, start = self._header(f)
+        if journal_sha != sha:
+            # No journal yet, or one for another version of the CSV
+            return
+        f.seek(max(offset, start))
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            entry = json.loads(line)
+            try:
+                getattr(store, entry["op"])(entry["records"])
+            except (KeyError, ValueError) as e:
+                print(f"Journaled upsert not applied: {e}")
+        self._applied[store] = (sha, f.tell())
+
+    def apply(self, store, op, records):
+        """
+        Run an upsert (op in OPERATIONS) on store and journal it for the other
+        workers; returns the op's result
+        Raises PermissionError if the store predates a change of the CSV
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown upsert operation: {op}")
+        if store not in self._applied:
+            # Read-only or never replayed: nothing to share
+            return getattr(store, op)(records)
+        with self._locked() as f:
+            # Entries from other workers come first, so everyone applies the same order
+            self._catch_up(store, f)
+            sha, _ = self._applied[store]
+            if self._header(f)[0] != sha:
+                if not fingerprint_matches({"sha256": sha}, self.source):
+                    raise PermissionError("Dataset file changed; reload the dataset before changing players")
+                # First upsert against this version of the CSV
+                f.truncate(0)
+                f.write(json.dumps({"source": source_fingerprint(self.source)}).encode("utf-8") + b"\n")
+            result = getattr(store, op)(records)
+            f.write(json.dumps({"op": op, "records": records}).encode("utf-8") + b"\n")
+            f.flush()
+            self._applied[store] = (sha, f.tell())
+        return result
+
+    def start_sync(self, interval=2.0):
+        """
+        Poll the journal every interval seconds and apply entries written by
+        other workers to the current store
+        """
+        if self._syncer is not None:
+            return
+        self._stop.clear()
+
+        def sync():
+            while not self._stop.wait(interval):
+                store = get_store()
+                applied = self._applied.get(store)
+                try:
+                    size = self.path.stat().st_size
+                except OSError:
+                    continue
+                if applied is None or size == applied[1]:
+                    continue
+                try:
+                    with self._locked() as f:
+                        self._catch_up(store, f)
+                except Exception as e:
+                    print(f"Upsert journal sync failed: {e}")
+
+        self._syncer = threading.Thread(target=sync, name="upsert-sync", daemon=True)
+        self._syncer.start()
+
+    def stop_sync(self):
+        self._stop.set()
+        self._syncer = None
+
+
+journal = PlayerJournal()
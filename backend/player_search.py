@@ -0,0 +1,195 @@
+"""
+Player-name autocomplete served from a prebuilt in-memory index
+
+Names are folded (accents stripped, case-folded, apostrophes dropped, other
+punctuation to spaces) so "muller" finds "Thomas Müller" and "oneil" finds
+"O'Neil". Matches are ranked in tiers, alphabetical
+within each tier:
+
+1. the name starts with the query (an exact match sorts first)
+2. a later word of the name starts with the query ("haal" -> "Erling Haaland")
+3. the query appears anywhere in the name (trigram lookup)
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+import numpy as np
+from backend.dataset_store import add_change_listener, get_store
+
+TRIGRAM = 3
+_separators = re.compile(r"[^\w]+|_")
+_spaces = re.compile(" ")
+# Apostrophes belong to the word they sit in: "O'Neil" folds to "oneil"
+_apostrophes = re.compile("['\u2018\u2019\u02bc\u0060\u00b4]")
+# Letters NFKD does not decompose into a base letter plus accents
+_special_letters = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "đ": "d", "ð": "d", "ł": "l", "ı": "i", "þ": "th"})
+
+
+def fold(text):
+    """
+    Accent- and case-insensitive form of a name, words separated by one space
+    """
+    text = _apostrophes.sub("", str(text).casefold())
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text.translate(_special_letters))
+        text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _separators.sub(" ", text).strip()
+
+
+def _trigram_codes(data):
+    """
+    Integer code of every byte trigram in a uint8 array
+    """
+    data = data.astype(np.int64)
+    return (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+
+
+def _build_trigram_keys(folded):
+    """
+    Sorted unique (trigram code * len(folded) + name id) keys, one per trigram
+    of each name: the posting list of a trigram is a contiguous slice
+    """
+    lengths = np.array([len(name.encode()) + 1 for name in folded], dtype=np.int64)
+    data = np.frombuffer("\n".join(folded).encode(), dtype=np.uint8)
+    if len(data) < TRIGRAM:
+        return np.empty(0, dtype=np.int64)
+    owner = np.repeat(np.arange(len(folded), dtype=np.int64), lengths)[:len(data)]
+    # A trigram is valid when it does not cross the separator into the next name
+    valid = (owner[:-2] == owner[2:]) & (data[2:] != ord("\n"))
+    keys = _trigram_codes(data)[valid] * len(folded) + owner[:-2][valid]
+    keys.sort()
+    # Drop repeats of a trigram within one name (np.unique is much slower here)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+
+class PlayerSearchIndex:
+    """
+    Sorted folded keys for prefix lookups by binary search, plus trigram
+    posting lists for substring lookups
+
+    Names added after construction are kept out of the trigram postings and
+    scanned directly; upserts add a handful of names, reloads rebuild the index
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.folded = []
+        self.name_keys = []   # (folded name, id), sorted
+        self.word_keys = []   # (folded name from its 2nd, 3rd... word on, id), sorted
+        self._ids = {}
+        self.add(names)
+        self._gram_base = len(self.folded)
+        self._gram_keys = _build_trigram_keys(self.folded)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, names):
+        """
+        Index names not seen before; keeps every key list sorted
+        """
+        new = [name for name in dict.fromkeys(names) if isinstance(name, str) and name not in self._ids]
+        entries = [(name, folded) for name, folded in zip(new, map(fold, new)) if folded]
+        first_id = len(self.names)
+        ids = range(first_id, first_id + len(entries))
+        self.names.extend(name for name, _ in entries)
+        self.folded.extend(folded for _, folded in entries)
+        self._ids.update(zip(self.names[first_id:], ids))
+
+        name_keys = list(zip(self.folded[first_id:], ids))
+        word_keys = [(folded[m.end():], name_id) for folded, name_id in name_keys for m in _spaces.finditer(folded)]
+        if first_id == 0:
+            self.name_keys = sorted(name_keys)
+            self.word_keys = sorted(word_keys)
+        else:
+            for key in name_keys:
+                insort(self.name_keys, key)
+            for key in word_keys:
+                insort(self.word_keys, key)
+
+    @staticmethod
+    def _prefixed(keys, query):
+        pos = bisect_left(keys, (query,))
+        while pos < len(keys) and keys[pos][0].startswith(query):
+            yield keys[pos][1]
+            pos += 1
+
+    def _posting(self, code):
+        keys = self._gram_keys
+        lo, hi = np.searchsorted(keys, [code * self._gram_base, (code + 1) * self._gram_base])
+        return keys[lo:hi] - code * self._gram_base
+
+    def _containing(self, query):
+        codes = set(_trigram_codes(np.frombuffer(query.encode(), dtype=np.uint8)).tolist())
+        # Every match contains every trigram, so scanning the rarest one is enough
+        candidates = min((self._posting(int(code)) for code in codes), key=len).tolist()
+        candidates += range(self._gram_base, len(self.folded))
+        matches = [i for i in candidates if query in self.folded[i]]
+        return sorted(matches, key=lambda i: self.folded[i])
+
+    def search(self, query, limit=10):
+        """
+        Up to limit names matching query, best matches first
+        An empty query returns the first names alphabetically
+        """
+        query = fold(query)
+        found = []
+        seen = set()
+
+        def take(ids):
+            for name_id in ids:
+                if len(found) >= limit:
+                    return True
+                if name_id not in seen:
+                    seen.add(name_id)
+                    found.append(name_id)
+            return len(found) >= limit
+
+        done = take(self._prefixed(self.name_keys, query))
+        if not done and query:
+            done = take(self._prefixed(self.word_keys, query))
+        if not done and len(query) >= TRIGRAM:
+            take(self._containing(query))
+        return [self.names[i] for i in found]
+
+
+_index = None
+_index_store = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    Search index of the current store, built on first use
+    """
+    global _index, _index_store
+    store = get_store()
+    if _index_store is not store:
+        with _index_lock:
+            if _index_store is not store:
+                _index = PlayerSearchIndex(store.player_index)
+                _index_store = store
+    return _index
+
+
+def search_players(query, limit=10):
+    return get_search_index().search(query, limit)
+
+
+def _on_dataset_change(store, player_names, teams):
+    global _index, _index_store
+    with _index_lock:
+        if player_names is None and store.read_only:
+            # Shared store: built on the first search, so workers that never
+            # search hold no copy of the names
+            _index, _index_store = None, None
+        elif player_names is None:
+            # New store: rebuild now, on the reload thread, not on a request
+            _index = PlayerSearchIndex(store.player_index)
+            _index_store = store
+        elif _index_store is store:
+            _index.add(player_names)
+
+
+add_change_listener(_on_dataset_change)
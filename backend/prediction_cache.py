@@ -0,0 +1,342 @@
+"""
+Bounded cache of prediction (and explanation) responses
+
+Entries are keyed by endpoint, normalized request body, model version,
+dataset content and the upsert revisions of the players and teams the body
+names, so a retrained model, a reload or an upsert can never serve an old
+answer, while an upsert leaves entries about other players valid. Entries
+expire after a TTL and the least recently used ones are evicted past the
+size limit.
+
+Backends (XAI_PREDICTION_CACHE):
+- memory: in-process LRU, per worker (default)
+- sqlite: one local database file shared by every worker on the host
+- off: no caching
+"""
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from backend.config import (
+    PREDICTION_CACHE_BACKEND,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL,
+    PREDICTION_CACHE_PATH,
+)
+from backend.dataset_store import add_change_listener, get_store
+
+
+# Tag of entries that depend on every player (unfiltered batches)
+ALL_PLAYERS = "\x00all"
+
+
+class MemoryBackend:
+    """
+    In-process LRU with per-entry expiry, plus an index of entries by tag
+    (the player and team names they depend on) for targeted drops
+    """
+
+    # Cheap enough to call on the event loop
+    blocking = False
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tagged = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires, _ = entry
+            if expires < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time() + ttl, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def drop_tagged(self, tags):
+        """
+        Drop every entry depending on one of the given names
+        """
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tagged.get(tag, set())
+            for key in keys:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    LRU with per-entry expiry in a local SQLite file, shared across processes
+    Values are stored as JSON
+    """
+
+    # Trim to max_entries once every this many writes
+    TRIM_EVERY = 64
+    # Disk I/O: called off the event loop
+    blocking = True
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        self._writes = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions (accessed)")
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires FROM predictions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] < now:
+            conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE predictions SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl, tags=()):
+        # Entries made stale by an upsert are never looked up again (their
+        # key changes) and age out through the TTL and LRU trim
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO predictions (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            self._trim(conn, now)
+
+    def _trim(self, conn, now):
+        conn.execute("DELETE FROM predictions WHERE expires < ?", (now,))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM predictions WHERE key IN "
+                "(SELECT key FROM predictions ORDER BY accessed LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self):
+        self._conn().execute("DELETE FROM predictions")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+class PredictionCache:
+    """
+    Backend plus TTL and per-endpoint hit/miss counters
+    """
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def make_key(endpoint, payload, model_version, dataset_key):
+        normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        raw = "\x1f".join([endpoint, normalized, str(model_version), dataset_key])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, endpoint, key):
+        value = self.backend.get(key)
+        counter = self.misses if value is None else self.hits
+        counter[endpoint] = counter.get(endpoint, 0) + 1
+        return value
+
+    def set(self, key, value, tags=()):
+        self.backend.set(key, value, self.ttl, tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "max_entries": self.backend.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "evictions": self.backend.evictions,
+            "by_endpoint": {
+                endpoint: {"hits": self.hits.get(endpoint, 0), "misses": self.misses.get(endpoint, 0)}
+                for endpoint in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+def _create_cache():
+    if PREDICTION_CACHE_BACKEND == "off":
+        return None
+    if PREDICTION_CACHE_BACKEND == "sqlite":
+        backend = SQLiteBackend(PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE)
+    elif PREDICTION_CACHE_BACKEND == "memory":
+        backend = MemoryBackend(PREDICTION_CACHE_SIZE)
+    else:
+        raise ValueError(f"Unknown prediction cache backend: {PREDICTION_CACHE_BACKEND}")
+    return PredictionCache(backend, PREDICTION_CACHE_TTL)
+
+
+cache = _create_cache()
+
+
+def _names(value):
+    # Every string value of a request body (field names excluded)
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _names(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _names(item)
+
+
+def unfiltered_selection(payload):
+    """
+    True for a batch payload with no player_names and no team, which selects
+    from every player
+    """
+    return payload.player_names is None and payload.team is None
+
+
+def cached_prediction(endpoint, model_version_attr, whole_dataset=None):
+    """
+    Cache a predict handler's response (sync or async handler)
+    The handler must take (payload, request); model_version_attr names the
+    app.state attribute holding the model version. Errors are never cached.
+    A response depends on the players and teams named in the payload, or on
+    every player when whole_dataset(payload) is true.
+    """
+    def entry_key(payload, request, store):
+        body = payload.model_dump()
+        tags = sorted(set(_names(body)))
+        revisions = [f"{store.player_revisions.get(tag, 0)}.{store.team_revisions.get(tag, 0)}" for tag in tags]
+        if whole_dataset is not None and whole_dataset(payload):
+            tags.append(ALL_PLAYERS)
+            revisions.append(str(store.revision))
+        key = cache.make_key(
+            endpoint,
+            body,
+            getattr(request.app.state, model_version_attr, None),
+            f"{store.content_key()}:{','.join(revisions)}",
+        )
+        return key, tuple(tags)
+
+    def lookup(payload, request):
+        store = get_store()
+        key, tags = entry_key(payload, request, store)
+        return key, tags, store, cache.get(endpoint, key)
+
+    def store_result(payload, request, key, tags, store, result):
+        # Skip storing if what the response depends on changed while the handler ran
+        if get_store() is store and entry_key(payload, request, store)[0] == key:
+            cache.set(key, result, tags)
+
+    def decorator(handler):
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def async_wrapper(payload, request):
+                if cache is None:
+                    return await handler(payload, request)
+                if cache.backend.blocking:
+                    key, tags, store, result = await run_in_threadpool(lookup, payload, request)
+                else:
+                    key, tags, store, result = lookup(payload, request)
+                if result is None:
+                    result = await handler(payload, request)
+                    if cache.backend.blocking:
+                        await run_in_threadpool(store_result, payload, request, key, tags, store, result)
+                    else:
+                        store_result(payload, request, key, tags, store, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(handler)
+        def wrapper(payload, request):
+            # Sync handlers already run on the threadpool
+            if cache is None:
+                return handler(payload, request)
+            key, tags, store, result = lookup(payload, request)
+            if result is None:
+                result = handler(payload, request)
+                store_result(payload, request, key, tags, store, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _on_dataset_change(store, player_names, teams):
+    if cache is None or not isinstance(cache.backend, MemoryBackend):
+        return
+    if player_names is None:
+        # Entries of an old store can never be hit again; free them in this process
+        cache.clear()
+    else:
+        # Only entries about the touched players and teams (or every player) went stale
+        cache.backend.drop_tagged(list(player_names) + list(teams) + [ALL_PLAYERS])
+
+
+add_change_listener(_on_dataset_change)
@@ -0,0 +1,120 @@
+"""
+Precomputed performance and injury predictions for every dataset row
+
+The models are deterministic functions of the stored feature rows, so with
+XAI_PRECOMPUTE_PREDICTIONS=1 every row is scored once at startup (and again
+after each dataset or model reload). /predict then serves the prediction by
+row id without invoking the model.
+
+A table is tagged with the store it was built from, that store's revision
+and the model versions; a lookup against anything else returns None, so a
+stale table is never served.
+"""
+import threading
+import numpy as np
+from backend.dataset_store import add_change_listener, get_store
+
+# Rows scored per model.predict call when building a table
+CHUNK_ROWS = 65536
+
+
+def _score(store, predictor, row_ids):
+    scores = np.empty(len(row_ids), dtype=np.float32)
+    for start in range(0, len(row_ids), CHUNK_ROWS):
+        chunk = row_ids[start:start + CHUNK_ROWS]
+        scores[start:start + len(chunk)] = predictor.predict_rows(store, chunk)
+    return scores
+
+
+class PredictionTable:
+    """
+    One float32 prediction per row and model, for one store revision
+    """
+
+    def __init__(self, store, models):
+        self.store = store
+        self.dataset_version = store.version
+        self.revision = store.revision
+        self.model_versions = {kind: version for kind, (_, version) in models.items()}
+        row_ids = np.arange(len(store), dtype=np.intp)
+        self.predictions = {
+            kind: _score(store, predictor, row_ids)
+            for kind, (predictor, _) in models.items()
+        }
+
+    def rescore(self, models, row_ids):
+        """
+        Score the given rows again (after an upsert), growing the table if
+        rows were appended
+        """
+        size = len(self.store)
+        for kind, (predictor, _) in models.items():
+            values = self.predictions[kind]
+            if len(values) < size:
+                values = np.concatenate([values, np.full(size - len(values), np.nan, dtype=np.float32)])
+            values[row_ids] = _score(self.store, predictor, row_ids)
+            self.predictions[kind] = values
+        # Change listeners run under the store's write lock, so this is the
+        # revision that includes the rescored rows
+        self.revision = self.store.revision
+
+
+_models = {}
+_table = None
+_table_lock = threading.Lock()
+
+
+def enable(models):
+    """
+    Build the table for the current store and keep it in sync from now on
+    models: {kind: (FastPredictor, model_version)}
+    """
+    global _models, _table
+    with _table_lock:
+        _models = dict(models)
+        _table = PredictionTable(get_store(), _models)
+    return _table
+
+
+def lookup(kind, player_name, model_version):
+    """
+    Precomputed prediction of a player, or None when there is no fresh table
+    (not enabled, built from another store/revision or model version)
+    """
+    table = _table
+    store = get_store()
+    if (table is None or table.store is not store or table.revision != store.revision
+            or table.model_versions.get(kind) != model_version):
+        return None
+    row_id = store.row_id(player_name)
+    if row_id is None:
+        return None
+    return float(table.predictions[kind][row_id])
+
+
+def status():
+    table = _table
+    if table is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "dataset_version": table.dataset_version,
+        "revision": table.revision,
+        "model_versions": table.model_versions,
+        "rows": len(table.store),
+    }
+
+
+def _on_dataset_change(store, player_names, teams):
+    global _table
+    if not _models:
+        return
+    with _table_lock:
+        if player_names is None:
+            # New store: score it now, on the reload thread
+            _table = PredictionTable(store, _models)
+        elif _table is not None and _table.store is store:
+            _table.rescore(_models, store.row_ids(player_names))
+
+
+add_change_listener(_on_dataset_change)
@@ -2,3 +2,5 @@ from . import common
 from . import performance
 from . import injury
 from . import match
+from . import admin
+from . import players
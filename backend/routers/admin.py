@@ -0,0 +1,84 @@
+import hmac
+from fastapi import APIRouter, Request, HTTPException, Header
+from typing import Optional
+from backend.config import ADMIN_TOKEN
+from backend.dataset_reload import reloader
+from backend import prediction_table
+from backend.prediction_cache import cache
+from backend import inference_executor
+
+router = APIRouter(tags=["Admin"])
+
+def check_token(x_admin_token: Optional[str]):
+    """
+    Raise a 403 unless x_admin_token matches XAI_ADMIN_TOKEN; with no token
+    configured, admin calls are refused
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled: XAI_ADMIN_TOKEN is not set")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.post("/reload", status_code=202)
+def reload_dataset(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Reloads the dataset in the background and swaps it in when ready, in
+    this worker now and in the others at their next generation poll
+    Requests keep being served from the current dataset meanwhile
+    """
+    check_token(x_admin_token)
+    started = reloader.request_reload()
+    if not started:
+        raise HTTPException(status_code=409, detail="A dataset reload is already in progress")
+    return reloader.status()
+
+@router.get("/reload")
+def reload_status(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Returns the current dataset version and the state of the last reload
+    """
+    check_token(x_admin_token)
+    return reloader.status()
+
+@router.get("/predictions")
+def prediction_table_status(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Returns whether the precomputed prediction table is enabled and what it was built from
+    """
+    check_token(x_admin_token)
+    return prediction_table.status()
+
+@router.get("/cache")
+def prediction_cache_stats(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Returns prediction cache size and hit/miss counters (of this worker)
+    """
+    check_token(x_admin_token)
+    if cache is None:
+        return {"backend": "off"}
+    return cache.stats()
+
+@router.delete("/cache")
+def clear_prediction_cache(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Drops every cached prediction
+    """
+    check_token(x_admin_token)
+    if cache is not None:
+        cache.clear()
+    return {"cleared": cache is not None}
+
+@router.get("/inference")
+def inference_stats(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Returns the inference pool settings and queue depths, and micro-batching
+    counters per model (of this worker)
+    """
+    check_token(x_admin_token)
+    stats = {"executor": inference_executor.status()}
+    for kind in ["performance", "injury"]:
+        for suffix in ["batcher", "explain_batcher"]:
+            batcher = getattr(request.app.state, f"{kind}_{suffix}", None)
+            if batcher is not None:
+                stats[f"{kind}_{suffix}"] = batcher.stats()
+    return stats
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Request
+from backend.catalog import catalog_response
 
 router = APIRouter()
 
 @router.get("/players")
 def get_players(request: Request):
-    df = request.app.state.dataset
-    return sorted(df["player_name"].dropna().unique().tolist())
+    return catalog_response(request, "players")
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request, HTTPException
-from backend.data_access import get_player_row
-from backend.schemas.injury_request import InjuryRequest
-from backend.utils.shap_helpers import (
-    get_shap_top_features,
-    format_key_factors,
-    extract_feature_importance
-)
+from backend.catalog import catalog_response
+from backend.prediction_cache import cached_prediction, unfiltered_selection
+from backend.data_access import get_player_features, select_players
+from backend.dataset_store import get_store
+from backend import prediction_table
+from backend.inference_executor import run_inference, run_explanation
+from backend.schemas.injury_request import InjuryRequest, InjuryBatchRequest
+from backend.utils.shap_helpers import explain_rows
 import pandas as pd
 import numpy as np
 
@@ -14,61 +15,37 @@ router = APIRouter(tags=["Injury"])
 @router.get("/players")
 def get_players(request: Request):
     """
-    Returns unique player names for dropdown
+    Returns unique player names for dropdown (ETag / 304 aware)
     """
-    df = request.app.state.dataset
-    return sorted(df["player_name"].dropna().unique().tolist())
+    return catalog_response(request, "players")
 
 @router.post("/predict")
-def predict_injury(payload: InjuryRequest, request: Request):
+@cached_prediction("injury", "injury_model_version")
+async def predict_injury(payload: InjuryRequest, request: Request):
     """
     Predicts injury risk and returns SHAP explanation
     """
-    df = request.app.state.dataset
-    model = request.app.state.injury_model
     explainer = request.app.state.injury_explainer
     feature_names = request.app.state.injury_features
 
     player_name = payload.player_name
-    player_row = get_player_row(player_name)
+    player_features = get_player_features(player_name, feature_names)
 
-    if player_row is None:
+    if player_features is None:
         raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
 
-    # Prepare features
-    X = pd.DataFrame([player_row[feature_names]])
-    X = X.fillna(0)
-
-    # Prediction
-    risk = float(model.predict(X)[0])
+    # Prediction: precomputed table lookup when enabled and fresh, otherwise
+    # one row of a micro-batched model call (matrix rows are already NaN-free)
+    risk = prediction_table.lookup("injury", player_name, request.app.state.injury_model_version)
+    if risk is None:
+        risk = await request.app.state.injury_batcher.submit(player_features)
     # Ensure risk is between 0 and 1
     risk = max(0.0, min(1.0, risk))
     risk_percentage = round(risk * 100, 2)
 
-    # SHAP Explanation
-    explanation = {}
+    # SHAP Explanation (micro-batched with concurrent requests too)
     if explainer is not None:
-        try:
-            # Get SHAP values (TreeExplainer works on raw data, no scaling needed)
-            shap_list = get_shap_top_features(
-                explainer=explainer,
-                model_input=X,
-                feature_names=feature_names,
-                top_k=5
-            )
-
-            explanation = {
-                "top_features": extract_feature_importance(shap_list),
-                "key_factors": format_key_factors(shap_list),
-                "shap_values": shap_list
-            }
-        except Exception as e:
-            print(f"SHAP explanation error: {e}")
-            explanation = {
-                "top_features": {},
-                "key_factors": ["SHAP explanation unavailable"],
-                "shap_values": []
-            }
+        explanation = await request.app.state.injury_explain_batcher.submit(player_features)
     else:
         explanation = {
             "top_features": {},
@@ -83,3 +60,56 @@ def predict_injury(payload: InjuryRequest, request: Request):
         "explanation": explanation
     }
 
+@router.post("/predict/batch")
+@cached_prediction("injury_batch", "injury_model_version", whole_dataset=unfiltered_selection)
+def predict_injury_batch(payload: InjuryBatchRequest, request: Request):
+    """
+    Scores injury risk for many players (e.g. a whole squad) with one model call
+
+    Input: player_names, and/or a team and/or position filter, optional top_n
+    Output: players sorted by injury risk, highest first
+    """
+    if payload.player_names is None and payload.team is None and payload.position is None:
+        raise HTTPException(status_code=400, detail="Provide player_names, team or position")
+    # One store for the whole request, even if a reload swaps it meanwhile
+    store = get_store()
+    if payload.team is not None and payload.team not in store.team_lookup:
+        raise HTTPException(status_code=404, detail=f"Team '{payload.team}' not found")
+
+    predictor = request.app.state.injury_predictor
+    explainer = request.app.state.injury_explainer
+    feature_names = request.app.state.injury_features
+
+    names, row_ids, not_found = select_players(payload.player_names, payload.team, payload.position, store)
+
+    players = []
+    if names:
+        # Same clipping as /predict: risk is kept between 0 and 1
+        risks = np.clip(run_inference(predictor.predict_rows, store, row_ids).astype(np.float64), 0.0, 1.0)
+
+        # Highest risk first; ties keep the selection order
+        order = np.argsort(-risks, kind="stable")
+        if payload.top_n is not None:
+            order = order[:payload.top_n]
+
+        players = [
+            {
+                "player": names[i],
+                "injury_risk": float(risks[i]),
+                "injury_risk_percentage": round(float(risks[i]) * 100, 2)
+            }
+            for i in order
+        ]
+        if payload.explain:
+            # Only the returned players are explained
+            X = pd.DataFrame(store.feature_rows(row_ids[order], feature_names), columns=feature_names)
+            explanations = run_explanation(explain_rows, explainer, X, feature_names)
+            for player, explanation in zip(players, explanations):
+                player["explanation"] = explanation
+
+    return {
+        "count": len(players),
+        "scored": len(names),
+        "players": players,
+        "not_found": not_found
+    }
@@ -1,12 +1,27 @@
 from fastapi import APIRouter, Request, HTTPException
-from backend.data_access import get_players_by_names
-from backend.schemas.match_request import MatchRequest
+from backend.catalog import catalog_response
+from backend.prediction_cache import cached_prediction
+from backend.data_access import (
+    get_team_summary,
+    get_default_squad as default_squad
+)
+from backend.dataset_store import get_store
+from backend.match_features import build_match_features, feature_frame, get_contributions, stats_from_vectors
+from backend.inference_executor import run_inference, run_explanation, run_optimization, PoolFull
+from backend.season_simulator import get_pairing_matrix, simulate_seasons
+from backend.knockout_simulator import neutral_matrix, round_names, simulate_bracket
+from backend.squad_optimizer import optimize_xi
+from backend.squads import POSITION_QUOTAS
+from backend.schemas.match_request import (
+    MatchRequest, MatchBatchRequest, MatchSwapRequest, SeasonSimulationRequest, KnockoutSimulationRequest,
+    BestXIRequest
+)
 from backend.utils.shap_helpers import (
+    shap_to_json,
     get_shap_top_features,
     format_key_factors,
     extract_feature_importance
 )
-import pandas as pd
 import numpy as np
 
 router = APIRouter(tags=["Match"])
@@ -14,52 +29,53 @@ router = APIRouter(tags=["Match"])
 @router.get("/players")
 def get_players(request: Request):
     """
-    Returns unique player names for dropdown
+    Returns unique player names for dropdown (ETag / 304 aware)
     """
-    df = request.app.state.dataset
-    return sorted(df["player_name"].dropna().unique().tolist())
+    return catalog_response(request, "players")
 
 @router.get("/teams")
 def get_teams(request: Request):
     """
-    Returns unique team names
+    Returns unique team names (ETag / 304 aware)
     """
-    df = request.app.state.dataset
-    return sorted(df["team"].dropna().unique().tolist())
+    return catalog_response(request, "teams")
 
 @router.get("/teams/{team_name}/players")
 def get_team_players(team_name: str, request: Request):
     """
     Returns all players for a given team
     """
-    df = request.app.state.dataset
-    team_players = df[df["team"] == team_name]["player_name"].unique().tolist()
+    store = get_store()
+    team_players = np.unique(store.player_names[store.team_rows(team_name)]).tolist()
     return sorted(team_players)
 
+@router.get("/teams/{team_name}/summary")
+def get_team_stats(team_name: str, request: Request):
+    """
+    Returns precomputed team statistics (averages and totals over all team rows)
+    """
+    summary = get_team_summary(team_name)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Team '{team_name}' not found")
+    return summary
+
 @router.get("/teams/{team_name}/squad")
 def get_default_squad(team_name: str, request: Request):
     """
-    Returns default Playing XI (first 11 unique players) for a team
+    Returns default Playing XI (position-balanced best 11) for a team
     """
-    df = request.app.state.dataset
-    team_df = df[df["team"] == team_name]
-    
-    # Get unique players sorted by average performance score (in case duplicates)
-    player_perf = team_df.groupby("player_name")["performance_score"].mean().reset_index()
-    player_perf = player_perf.sort_values("performance_score", ascending=False)
-    
-    # Get top 11 unique players
-    top_11_players = player_perf.head(11)["player_name"].tolist()
+    squad = default_squad(team_name)
     
     squad_data = {
-        "squad": top_11_players,
+        "squad": squad,
         "team": team_name,
-        "count": len(top_11_players)
+        "count": len(squad)
     }
     
     return squad_data
 
 @router.post("/predict")
+@cached_prediction("match", "match_model_version")
 def predict_match(payload: MatchRequest, request: Request):
     """
     Predicts match outcome between two teams of 11 players each
@@ -67,137 +83,99 @@ def predict_match(payload: MatchRequest, request: Request):
     Input: List of 11 player names for Team A and Team B
     Output: Win probabilities and SHAP explanation
     """
-    df = request.app.state.dataset
-    model = request.app.state.match_model
-    explainer = request.app.state.match_explainer
-    feature_names = request.app.state.match_features
-
     team_a_players = payload.team_a
     team_b_players = payload.team_b
+    store = get_store()
 
-    # Validate inputs
-    if len(team_a_players) != 11:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Team A must have exactly 11 players. Got {len(team_a_players)}"
-        )
-    
-    if len(team_b_players) != 11:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Team B must have exactly 11 players. Got {len(team_b_players)}"
-        )
+    _validate_fixture(store, team_a_players, team_b_players)
 
-    # Check for duplicate players within teams
-    if len(set(team_a_players)) != len(team_a_players):
-        raise HTTPException(
-            status_code=400,
-            detail="Team A has duplicate players"
-        )
-    
-    if len(set(team_b_players)) != len(team_b_players):
-        raise HTTPException(
-            status_code=400,
-            detail="Team B has duplicate players"
-        )
+    # Team statistics and model features
+    X, stats_a, stats_b = build_match_features(store, [(team_a_players, team_b_players)])
 
-    # Check for players playing in both teams
-    common_players = set(team_a_players) & set(team_b_players)
-    if common_players:
+    return _predict_fixture(request, store, team_a_players, team_b_players, X, stats_a, stats_b)
+
+@router.post("/predict/swap")
+@cached_prediction("match_swap", "match_model_version")
+def predict_match_swap(payload: MatchSwapRequest, request: Request):
+    """
+    Predicts a fixture after swapping one player, for interactive squad editing
+
+    Input: the current 11 + 11 player names, the side being edited, and the
+    player going out and the one coming in
+    Output: same as /predict, plus the updated team_a and team_b lists.
+    The edited side's feature row is updated from its cached squad vector
+    (minus player_out, plus player_in) instead of being rebuilt.
+    """
+    store = get_store()
+    team = payload.team_a if payload.side == "team_a" else payload.team_b
+    if payload.player_out not in team:
         raise HTTPException(
             status_code=400,
-            detail=f"Players cannot be in both teams: {', '.join(common_players)}"
+            detail=f"'{payload.player_out}' is not in {'Team A' if payload.side == 'team_a' else 'Team B'}"
         )
+    if payload.player_out not in store.player_index:
+        raise HTTPException(status_code=404, detail=f"Player '{payload.player_out}' not found")
 
-    # Get player data
-    team_a_df = get_players_by_names(team_a_players)
-    team_b_df = get_players_by_names(team_b_players)
+    swapped = [payload.player_in if name == payload.player_out else name for name in team]
+    team_a_players = swapped if payload.side == "team_a" else payload.team_a
+    team_b_players = payload.team_b if payload.side == "team_a" else swapped
+    _validate_fixture(store, team_a_players, team_b_players)
 
-    # Check if all players exist
-    missing_a = set(team_a_players) - set(team_a_df["player_name"].values)
-    missing_b = set(team_b_players) - set(team_b_df["player_name"].values)
-    
-    if missing_a:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Team A players not found: {', '.join(missing_a)}"
-        )
-    
-    if missing_b:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Team B players not found: {', '.join(missing_b)}"
-        )
+    contributions = get_contributions(store)
+    _, vector = contributions.swap(team, payload.player_out, payload.player_in)
+    if payload.side == "team_a":
+        vectors = [vector, contributions.squad_vector(team_b_players)]
+    else:
+        vectors = [contributions.squad_vector(team_a_players), vector]
+    stats = stats_from_vectors(np.vstack(vectors))
+    stats_a = {name: values[0:1] for name, values in stats.items()}
+    stats_b = {name: values[1:2] for name, values in stats.items()}
 
-    # Calculate team statistics
-    team_a_performance = team_a_df["performance_score"].mean()
-    team_a_injury_risk = team_a_df["injury_risk"].mean()
-    team_a_goals = team_a_df["goals"].sum()
-    team_a_assists = team_a_df["assists"].sum()
-    team_a_passes = team_a_df["passes"].sum()
-
-    team_b_performance = team_b_df["performance_score"].mean()
-    team_b_injury_risk = team_b_df["injury_risk"].mean()
-    team_b_goals = team_b_df["goals"].sum()
-    team_b_assists = team_b_df["assists"].sum()
-    team_b_passes = team_b_df["passes"].sum()
-
-    # Calculate additional features for model
-    team_a_starters = (team_a_df["is_starting_xi"] == 1).sum()
-    team_a_goals_per_match = team_a_goals / max(1, (team_a_df["matches_played"] > 0).sum())
-    
-    team_b_starters = (team_b_df["is_starting_xi"] == 1).sum()
-    team_b_goals_per_match = team_b_goals / max(1, (team_b_df["matches_played"] > 0).sum())
-
-    # Prepare features for model - use the exact feature names the model expects
-    match_features = {
-        "team_a_performance": team_a_performance,
-        "team_a_injury_risk": team_a_injury_risk,
-        "team_a_goals": team_a_goals,
-        "team_a_starters": team_a_starters,
-        "team_a_goals_per_match": team_a_goals_per_match,
-        "team_b_performance": team_b_performance,
-        "team_b_injury_risk": team_b_injury_risk,
-        "team_b_goals": team_b_goals,
-        "team_b_starters": team_b_starters,
-        "team_b_goals_per_match": team_b_goals_per_match,
-    }
+    result = _predict_fixture(request, store, team_a_players, team_b_players, feature_frame(stats_a, stats_b), stats_a, stats_b)
+    result["team_a"] = team_a_players
+    result["team_b"] = team_b_players
+    return result
 
-    X = pd.DataFrame([match_features])
-    X = X.fillna(0)
+def _predict_fixture(request, store, team_a_players, team_b_players, X, stats_a, stats_b):
+    """
+    Prediction and explanation response for one fixture's model input
+    """
+    engine = request.app.state.match_engine
+    explainer = request.app.state.match_explainer
+
+    # One pass over the trees for the win probabilities; the SHAP contributions
+    # (computed natively by XGBoost) are added when explanations are enabled
+    explain_natively = explainer is not None and engine.native
+    run = run_explanation if explain_natively else run_inference
+    team_a_probs, team_b_probs, contributions = run(engine.infer, X, contributions=explain_natively)
 
-    # Prediction
-    prediction = model.predict(X)[0]
-    probabilities = model.predict_proba(X)[0]
-    
-    # Get class names - model is XGBClassifier, not Pipeline
-    class_names = model.classes_
-    
-    # Map probabilities to win probabilities (convert to Python float)
-    # The model prediction output maps to classes: predict(X)[0] returns 0 or 1
     # Class 1 -> Team A wins, Class 0 -> Team B wins
-    # So probabilities[1] = Team A win probability, probabilities[0] = Team B win probability
-    team_a_win_prob = float(probabilities[1]) if len(probabilities) > 1 else float(probabilities[0])
-    team_b_win_prob = float(probabilities[0]) if len(probabilities) > 1 else float(1 - probabilities[0])
+    team_a_win_prob = float(team_a_probs[0])
+    team_b_win_prob = float(team_b_probs[0])
 
     # SHAP Explanation
     explanation = {}
     if explainer is not None:
         try:
-            # Get SHAP values (pass X directly - no scaler needed)
-            shap_list = get_shap_top_features(
-                explainer=explainer,
-                model_input=X,
-                feature_names=feature_names,
-                top_k=10
-            )
+            if contributions is not None:
+                shap_list = shap_to_json(contributions, engine.feature_names, top_k=10)
+            else:
+                shap_list = run_explanation(
+                    get_shap_top_features,
+                    explainer=explainer,
+                    model_input=X,
+                    feature_names=engine.feature_names,
+                    top_k=10
+                )
             
             explanation = {
                 "top_features": extract_feature_importance(shap_list),
                 "key_factors": format_key_factors(shap_list),
                 "shap_values": shap_list,
                 "influential_players": _get_influential_players(
-                    shap_list, team_a_df, team_b_df
+                    shap_list,
+                    store.frame(store.player_rows(team_a_players)),
+                    store.frame(store.player_rows(team_b_players))
                 )
             }
         except Exception as e:
@@ -220,18 +198,8 @@ def predict_match(payload: MatchRequest, request: Request):
         "team_a_win_probability": float(round(team_a_win_prob * 100, 2)),
         "team_b_win_probability": float(round(team_b_win_prob * 100, 2)),
         "predicted_winner": "Team A" if team_a_win_prob > team_b_win_prob else "Team B",
-        "team_a_stats": {
-            "avg_performance": float(round(team_a_performance, 2)),
-            "avg_injury_risk": float(round(team_a_injury_risk, 2)),
-            "total_goals": int(team_a_goals),
-            "total_assists": int(team_a_assists)
-        },
-        "team_b_stats": {
-            "avg_performance": float(round(team_b_performance, 2)),
-            "avg_injury_risk": float(round(team_b_injury_risk, 2)),
-            "total_goals": int(team_b_goals),
-            "total_assists": int(team_b_assists)
-        },
+        "team_a_stats": _team_stats(stats_a, 0),
+        "team_b_stats": _team_stats(stats_b, 0),
         "explanation": explanation
     }
 
@@ -264,3 +232,323 @@ def _get_influential_players(shap_list, team_a_df, team_b_df):
             })
     
     return influential
+
+def _validate_fixture(store, team_a_players, team_b_players):
+    """
+    Raise an HTTPException unless both teams are 11 distinct, known players
+    with nobody in both teams
+    """
+    # Validate inputs
+    if len(team_a_players) != 11:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Team A must have exactly 11 players. Got {len(team_a_players)}"
+        )
+    
+    if len(team_b_players) != 11:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Team B must have exactly 11 players. Got {len(team_b_players)}"
+        )
+
+    # Check for duplicate players within teams
+    if len(set(team_a_players)) != len(team_a_players):
+        raise HTTPException(
+            status_code=400,
+            detail="Team A has duplicate players"
+        )
+    
+    if len(set(team_b_players)) != len(team_b_players):
+        raise HTTPException(
+            status_code=400,
+            detail="Team B has duplicate players"
+        )
+
+    # Check for players playing in both teams
+    common_players = set(team_a_players) & set(team_b_players)
+    if common_players:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Players cannot be in both teams: {', '.join(common_players)}"
+        )
+
+    # Check if all players exist
+    player_index = store.player_index
+    missing_a = [name for name in team_a_players if name not in player_index]
+    missing_b = [name for name in team_b_players if name not in player_index]
+
+    if missing_a:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Team A players not found: {', '.join(missing_a)}"
+        )
+
+    if missing_b:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Team B players not found: {', '.join(missing_b)}"
+        )
+
+@router.post("/predict/batch")
+@cached_prediction("match_batch", "match_model_version")
+def predict_match_batch(payload: MatchBatchRequest, request: Request):
+    """
+    Predicts many fixtures (e.g. a full matchday) with one pass over the model
+
+    Input: list of fixtures, each with 11 player names for Team A and Team B
+    Output: one result per fixture, in input order; an invalid fixture gets an
+    "error" entry instead of failing the whole batch
+    """
+    engine = request.app.state.match_engine
+
+    store = get_store()
+
+    results = [None] * len(payload.fixtures)
+    valid = []
+    for i, fixture in enumerate(payload.fixtures):
+        try:
+            _validate_fixture(store, fixture.team_a, fixture.team_b)
+            valid.append(i)
+        except HTTPException as e:
+            results[i] = {"fixture": i, "error": e.detail}
+
+    if valid:
+        X, stats_a, stats_b = build_match_features(
+            store, [(payload.fixtures[i].team_a, payload.fixtures[i].team_b) for i in valid]
+        )
+        # Class 1 -> Team A wins, Class 0 -> Team B wins
+        team_a_probs, team_b_probs, _ = run_inference(engine.infer, X)
+        for k, i in enumerate(valid):
+            team_a_win_prob = float(team_a_probs[k])
+            team_b_win_prob = float(team_b_probs[k])
+            results[i] = {
+                "fixture": i,
+                "team_a_win_probability": float(round(team_a_win_prob * 100, 2)),
+                "team_b_win_probability": float(round(team_b_win_prob * 100, 2)),
+                "predicted_winner": "Team A" if team_a_win_prob > team_b_win_prob else "Team B",
+                "team_a_stats": _team_stats(stats_a, k),
+                "team_b_stats": _team_stats(stats_b, k)
+            }
+
+    return {
+        "count": len(valid),
+        "results": results
+    }
+
+@router.post("/simulate/season")
+@cached_prediction("season", "match_model_version")
+def simulate_season(payload: SeasonSimulationRequest, request: Request):
+    """
+    Monte Carlo simulation of a double round-robin season between teams
+
+    Input: team names (each plays its default squad), number of simulated
+    seasons, top / relegation spots and a random seed (same seed, same result)
+    Output: per-team title, top-spot and relegation probabilities, expected
+    points and average finishing position, best expected points first
+    """
+    teams = payload.teams
+    if len(set(teams)) != len(teams):
+        raise HTTPException(status_code=400, detail="Teams must be distinct")
+
+    store = get_store()
+    missing = [team for team in teams if not store.default_squads.get(team)]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Teams not found: {', '.join(missing)}")
+
+    if payload.top_spots > len(teams) or payload.relegation_spots >= len(teams):
+        raise HTTPException(status_code=400, detail="Top and relegation spots must fit in the league")
+
+    # Every pairing scored in one pass (or taken from the matrix cache), then
+    # the seasons drawn from the matrix
+    matrix, _ = run_inference(
+        get_pairing_matrix, request.app.state.match_engine, store,
+        [store.default_squads[team] for team in teams], request.app.state.match_model_version
+    )
+    outcome = simulate_seasons(
+        matrix, payload.simulations, payload.top_spots, payload.relegation_spots, payload.seed
+    )
+
+    table = [
+        {
+            "team": team,
+            "expected_points": float(round(outcome["expected_points"][k], 2)),
+            "average_position": float(round(outcome["average_position"][k], 2)),
+            "title_probability": float(round(outcome["title"][k] * 100, 2)),
+            "top_probability": float(round(outcome["top"][k] * 100, 2)),
+            "relegation_probability": float(round(outcome["relegation"][k] * 100, 2))
+        }
+        for k, team in enumerate(teams)
+    ]
+    table.sort(key=lambda row: row["expected_points"], reverse=True)
+
+    return {
+        "teams": len(teams),
+        "simulations": payload.simulations,
+        "matches_per_season": len(teams) * (len(teams) - 1),
+        "top_spots": payload.top_spots,
+        "relegation_spots": payload.relegation_spots,
+        "table": table
+    }
+
+@router.post("/simulate/knockout")
+@cached_prediction("knockout", "match_model_version")
+def simulate_knockout(payload: KnockoutSimulationRequest, request: Request):
+    """
+    Monte Carlo simulation of a seeded knockout bracket
+
+    Input: entries in bracket order (1 v 2, 3 v 4, ...; a power of two),
+    each a team name with an optional custom squad of 11 players (default:
+    the team's default squad), number of simulated brackets and a random seed
+    Output: per-entry probability of reaching each round, best chance of
+    winning first. The win-probability matrix of a bracket is cached, so
+    repeated queries do not run the model again.
+    """
+    entries = payload.entries
+    if len(entries) & (len(entries) - 1):
+        raise HTTPException(status_code=400, detail=f"Bracket size must be a power of two. Got {len(entries)}")
+    labels = [entry.team for entry in entries]
+    if len(set(labels)) != len(labels):
+        raise HTTPException(status_code=400, detail="Bracket entries must be distinct")
+
+    store = get_store()
+    squads = []
+    for entry in entries:
+        if entry.squad is None:
+            squad = store.default_squads.get(entry.team)
+            if not squad:
+                raise HTTPException(status_code=404, detail=f"Team '{entry.team}' not found")
+        else:
+            squad = entry.squad
+            if len(squad) != 11 or len(set(squad)) != len(squad):
+                raise HTTPException(
+                    status_code=400, detail=f"Squad of '{entry.team}' must have exactly 11 distinct players"
+                )
+            missing = [name for name in squad if name not in store.player_index]
+            if missing:
+                raise HTTPException(
+                    status_code=404, detail=f"{entry.team} players not found: {', '.join(missing)}"
+                )
+        squads.append(list(squad))
+
+    matrix, _ = run_inference(
+        get_pairing_matrix, request.app.state.match_engine, store, squads,
+        request.app.state.match_model_version
+    )
+    reached = simulate_bracket(neutral_matrix(matrix), payload.simulations, payload.seed)
+    stages = round_names(len(entries))
+
+    results = [
+        {
+            "team": label,
+            "seed": k + 1,
+            "rounds": {stage: float(round(reached[r][k] * 100, 2)) for r, stage in enumerate(stages)}
+        }
+        for k, label in enumerate(labels)
+    ]
+    results.sort(key=lambda row: row["rounds"]["winner"], reverse=True)
+
+    return {
+        "entries": len(entries),
+        "simulations": payload.simulations,
+        "rounds": stages,
+        "results": results
+    }
+
+@router.post("/optimize/xi")
+def optimize_best_xi(payload: BestXIRequest, request: Request):
+    """
+    Searches a team's players for the XI with the best win probability
+    against an opponent (the team plays as Team A)
+
+    Input: team, opponent team (default squad, or opponent_squad of 11
+    players), search time budget in milliseconds and a random seed
+    Output: best XI found and its win probability, the default XI's win
+    probability and the gain, plus search statistics. Swaps only exchange
+    players of the same position, so the default squad's position balance
+    is kept. Not cached: how far the search gets depends on the time budget
+    and the machine's load.
+    """
+    store = get_store()
+    start = store.default_squads.get(payload.team)
+    if not start:
+        raise HTTPException(status_code=404, detail=f"Team '{payload.team}' not found")
+
+    if payload.opponent_squad is None:
+        if payload.opponent == payload.team:
+            raise HTTPException(status_code=400, detail="Team and opponent must differ")
+        opponent = store.default_squads.get(payload.opponent)
+        if not opponent:
+            raise HTTPException(status_code=404, detail=f"Team '{payload.opponent}' not found")
+        opponent = list(opponent)
+    else:
+        opponent = payload.opponent_squad
+        if len(opponent) != 11 or len(set(opponent)) != len(opponent):
+            raise HTTPException(status_code=400, detail="Opponent squad must have exactly 11 distinct players")
+        missing = [name for name in opponent if name not in store.player_index]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Opponent players not found: {', '.join(missing)}")
+    common_players = set(start) & set(opponent)
+    if common_players:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Players cannot be in both teams: {', '.join(common_players)}"
+        )
+
+    # Candidates: every player of the team (position from their first team row),
+    # except anyone in the opponent's XI
+    rows = store.team_rows(payload.team)
+    names = store.player_names[rows]
+    _, first = np.unique(names, return_index=True)
+    first = np.sort(first)
+    pool, positions = [], []
+    for name, position in zip(names[first], store.position_codes[rows][first]):
+        if name not in opponent:
+            pool.append(name)
+            positions.append(int(position))
+
+    engine = request.app.state.match_engine
+    try:
+        # Own pool: a long search never holds up /predict calls
+        best, search = run_optimization(
+            optimize_xi, engine, store, pool, positions, start, opponent, payload.time_budget_ms / 1000, payload.seed
+        )
+    except PoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Both XIs scored again from scratch, exactly as /predict would
+    X, _, _ = build_match_features(store, [(list(start), opponent), (best, opponent)])
+    team_a_probs, _, _ = run_inference(engine.infer, X)
+    baseline_prob = float(round(float(team_a_probs[0]) * 100, 2))
+    best_prob = float(round(float(team_a_probs[1]) * 100, 2))
+    if best_prob < baseline_prob:
+        best, best_prob = list(start), baseline_prob
+
+    position_of = {
+        name: store.positions[code] if code >= 0 else None for name, code in zip(pool, positions)
+    }
+    position_order = list(POSITION_QUOTAS)
+    return {
+        "team": payload.team,
+        "opponent": payload.opponent,
+        "best_xi": [
+            {"player": name, "position": position_of[name]}
+            for name in sorted(best, key=lambda name: (
+                position_order.index(position_of[name]) if position_of[name] in position_order else len(position_order)
+            ))
+        ],
+        "default_xi": list(start),
+        "players_in": [name for name in best if name not in start],
+        "players_out": [name for name in start if name not in best],
+        "default_win_probability": baseline_prob,
+        "best_win_probability": best_prob,
+        "win_probability_gain": float(round(best_prob - baseline_prob, 2)),
+        "search": search
+    }
+
+def _team_stats(stats, k):
+    return {
+        "avg_performance": float(round(stats["performance"][k], 2)),
+        "avg_injury_risk": float(round(stats["injury_risk"][k], 2)),
+        "total_goals": int(stats["goals"][k]),
+        "total_assists": int(stats["assists"][k])
+    }
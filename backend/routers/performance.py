@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request, HTTPException
-from backend.data_access import get_player_row
-from backend.schemas.performance_request import PerformanceRequest
-from backend.utils.shap_helpers import (
-    get_shap_top_features,
-    format_key_factors,
-    extract_feature_importance
-)
+from backend.catalog import catalog_response
+from backend.prediction_cache import cached_prediction, unfiltered_selection
+from backend.data_access import get_player_features, select_players
+from backend.dataset_store import get_store
+from backend import prediction_table
+from backend.inference_executor import run_inference, run_explanation
+from backend.schemas.performance_request import PerformanceRequest, PerformanceBatchRequest
+from backend.utils.shap_helpers import explain_rows
 import pandas as pd
 import numpy as np
 
@@ -14,58 +15,34 @@ router = APIRouter(tags=["Performance"])
 @router.get("/players")
 def get_players(request: Request):
     """
-    Returns unique player names for dropdown
+    Returns unique player names for dropdown (ETag / 304 aware)
     """
-    df = request.app.state.dataset
-    return sorted(df["player_name"].dropna().unique().tolist())
+    return catalog_response(request, "players")
 
 @router.post("/predict")
-def predict_performance(payload: PerformanceRequest, request: Request):
+@cached_prediction("performance", "performance_model_version")
+async def predict_performance(payload: PerformanceRequest, request: Request):
     """
     Predicts player performance and returns SHAP explanation
     """
-    df = request.app.state.dataset
-    model = request.app.state.performance_model
     explainer = request.app.state.performance_explainer
     feature_names = request.app.state.performance_features
 
     player_name = payload.player_name
-    player_row = get_player_row(player_name)
+    player_features = get_player_features(player_name, feature_names)
 
-    if player_row is None:
+    if player_features is None:
         raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
 
-    # Prepare features
-    X = pd.DataFrame([player_row[feature_names]])
-    X = X.fillna(0)
+    # Prediction: precomputed table lookup when enabled and fresh, otherwise
+    # one row of a micro-batched model call (matrix rows are already NaN-free)
+    prediction = prediction_table.lookup("performance", player_name, request.app.state.performance_model_version)
+    if prediction is None:
+        prediction = await request.app.state.performance_batcher.submit(player_features)
 
-    # Prediction
-    prediction = float(model.predict(X)[0])
-
-    # SHAP Explanation
-    explanation = {}
+    # SHAP Explanation (micro-batched with concurrent requests too)
     if explainer is not None:
-        try:
-            # Get SHAP values (TreeExplainer works on raw data, no scaling needed)
-            shap_list = get_shap_top_features(
-                explainer=explainer,
-                model_input=X,
-                feature_names=feature_names,
-                top_k=5
-            )
-
-            explanation = {
-                "top_features": extract_feature_importance(shap_list),
-                "key_factors": format_key_factors(shap_list),
-                "shap_values": shap_list
-            }
-        except Exception as e:
-            print(f"SHAP explanation error: {e}")
-            explanation = {
-                "top_features": {},
-                "key_factors": ["SHAP explanation unavailable"],
-                "shap_values": []
-            }
+        explanation = await request.app.state.performance_explain_batcher.submit(player_features)
     else:
         explanation = {
             "top_features": {},
@@ -78,3 +55,45 @@ def predict_performance(payload: PerformanceRequest, request: Request):
         "predicted_performance": round(prediction, 2),
         "explanation": explanation
     }
+
+@router.post("/predict/batch")
+@cached_prediction("performance_batch", "performance_model_version", whole_dataset=unfiltered_selection)
+def predict_performance_batch(payload: PerformanceBatchRequest, request: Request):
+    """
+    Predicts performance for many players with one model call
+
+    Input: player_names, and/or a team and/or position filter
+    Output: one prediction per player (optionally with SHAP explanations)
+    """
+    if payload.player_names is None and payload.team is None and payload.position is None:
+        raise HTTPException(status_code=400, detail="Provide player_names, team or position")
+    # One store for the whole request, even if a reload swaps it meanwhile
+    store = get_store()
+    if payload.team is not None and payload.team not in store.team_lookup:
+        raise HTTPException(status_code=404, detail=f"Team '{payload.team}' not found")
+
+    predictor = request.app.state.performance_predictor
+    explainer = request.app.state.performance_explainer
+    feature_names = request.app.state.performance_features
+
+    names, row_ids, not_found = select_players(payload.player_names, payload.team, payload.position, store)
+
+    predictions = []
+    if names:
+        # One block gathered from the feature matrix, one model call
+        scores = np.round(run_inference(predictor.predict_rows, store, row_ids).astype(np.float64), 2).tolist()
+        predictions = [
+            {"player": name, "predicted_performance": score}
+            for name, score in zip(names, scores)
+        ]
+        if payload.explain:
+            X = pd.DataFrame(store.feature_rows(row_ids, feature_names), columns=feature_names)
+            explanations = run_explanation(explain_rows, explainer, X, feature_names)
+            for prediction, explanation in zip(predictions, explanations):
+                prediction["explanation"] = explanation
+
+    return {
+        "count": len(predictions),
+        "predictions": predictions,
+        "not_found": not_found
+    }
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Request, HTTPException, Query, Header
+from typing import Optional
+from backend.dataset_store import get_store
+from backend.player_journal import journal
+from backend.routers.admin import check_token
+from backend.player_search import search_players
+from backend.schemas.player_request import PlayerCreateRequest, PlayerUpdateRequest
+
+router = APIRouter(tags=["Players"])
+
+@router.get("/search")
+def search(request: Request, q: str = "", limit: int = Query(10, ge=1, le=100)):
+    """
+    Autocomplete: player names matching q, accent and case insensitive,
+    best matches first
+    """
+    return search_players(q, limit)
+
+@router.post("", status_code=201)
+def add_players(payload: PlayerCreateRequest, request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Appends new players to the live dataset, in every worker
+    Only the new rows' features, their teams' aggregates and squads are recomputed
+    """
+    check_token(x_admin_token)
+    store = get_store()
+    try:
+        added = journal.apply(store, "add_players", [player.model_dump() for player in payload.players])
+    except PermissionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "added": added,
+        "dataset_version": store.version,
+        "revision": store.revision
+    }
+
+@router.patch("")
+def update_players(payload: PlayerUpdateRequest, request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Updates fields of existing players in the live dataset, in every worker
+    Only the touched rows' features, their teams' aggregates and squads are recomputed
+    """
+    check_token(x_admin_token)
+    store = get_store()
+    try:
+        updated = journal.apply(store, "update_players", [player.model_dump(exclude_none=True) for player in payload.players])
+    except PermissionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "updated": updated,
+        "dataset_version": store.version,
+        "revision": store.revision
+    }
@@ -1,4 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class InjuryRequest(BaseModel):
     player_name: str
+
+class InjuryBatchRequest(BaseModel):
+    player_names: Optional[List[str]] = None
+    team: Optional[str] = None
+    position: Optional[str] = None
+    top_n: Optional[int] = Field(default=None, ge=1)
+    explain: bool = False
@@ -1,6 +1,37 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class MatchRequest(BaseModel):
     team_a: List[str]
     team_b: List[str]
+
+class MatchBatchRequest(BaseModel):
+    fixtures: List[MatchRequest]
+
+class MatchSwapRequest(MatchRequest):
+    side: Literal["team_a", "team_b"]
+    player_out: str
+    player_in: str
+
+class SeasonSimulationRequest(BaseModel):
+    teams: List[str] = Field(min_length=2)
+    simulations: int = Field(default=10000, ge=1, le=100000)
+    top_spots: int = Field(default=4, ge=1)
+    relegation_spots: int = Field(default=3, ge=0)
+    seed: int = 0
+
+class BracketEntry(BaseModel):
+    team: str
+    squad: Optional[List[str]] = None
+
+class KnockoutSimulationRequest(BaseModel):
+    entries: List[BracketEntry] = Field(min_length=2)
+    simulations: int = Field(default=10000, ge=1, le=100000)
+    seed: int = 0
+
+class BestXIRequest(BaseModel):
+    team: str
+    opponent: str
+    opponent_squad: Optional[List[str]] = None
+    time_budget_ms: int = Field(default=500, ge=10, le=10000)
+    seed: int = 0
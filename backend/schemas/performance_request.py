@@ -1,4 +1,11 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 class PerformanceRequest(BaseModel):
     player_name: str
+
+class PerformanceBatchRequest(BaseModel):
+    player_names: Optional[List[str]] = None
+    team: Optional[str] = None
+    position: Optional[str] = None
+    explain: bool = False
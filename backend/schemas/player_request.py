@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class PlayerRecord(BaseModel):
+    player_name: str
+    team: str
+    position: str
+    age: int
+    minutes_played: int
+    matches_played: int
+    goals: int = 0
+    assists: int = 0
+    passes: int = 0
+    shots: int = 0
+    tackles: int = 0
+    injuries_last_season: int = 0
+    performance_score: float
+    injury_risk: float
+    is_starting_xi: int = 0
+
+class PlayerUpdate(BaseModel):
+    player_name: str
+    team: Optional[str] = None
+    position: Optional[str] = None
+    age: Optional[int] = None
+    minutes_played: Optional[int] = None
+    matches_played: Optional[int] = None
+    goals: Optional[int] = None
+    assists: Optional[int] = None
+    passes: Optional[int] = None
+    shots: Optional[int] = None
+    tackles: Optional[int] = None
+    injuries_last_season: Optional[int] = None
+    performance_score: Optional[float] = None
+    injury_risk: Optional[float] = None
+    is_starting_xi: Optional[int] = None
+
+class PlayerCreateRequest(BaseModel):
+    players: List[PlayerRecord]
+
+class PlayerUpdateRequest(BaseModel):
+    players: List[PlayerUpdate]
@@ -0,0 +1,113 @@
+"""
+Monte Carlo simulation of a double round-robin league season
+
+Every ordered pairing (home side as Team A) is scored once by the match
+model, in one pass over an (n * (n - 1))-row feature block built from the
+teams' contribution vectors. Seasons are then simulated with NumPy: each
+match is a Bernoulli draw on its win probability (the model has no draw
+class), a win is worth 3 points, and ties on points are broken at random.
+
+Pairing matrices are cached by dataset content and revision, model version
+and squads,
+so repeated simulations of the same teams never run the model again.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+from backend.match_features import side_stats, feature_frame
+
+# Seasons simulated per block (bounds memory: CHUNK_SEASONS x matches draws)
+CHUNK_SEASONS = 2000
+
+# Pairing matrices kept (one per distinct set of squads)
+MATRIX_CACHE_SIZE = 64
+
+
+def pairing_matrix(engine, store, squads):
+    """
+    (n, n) matrix of P(team i beats team j) with i as Team A, NaN on the diagonal
+    engine is a backend.fast_inference.MatchEngine
+    """
+    n = len(squads)
+    stats = side_stats(store, squads)
+    home, away = np.nonzero(~np.eye(n, dtype=bool))
+    X = feature_frame(
+        {name: values[home] for name, values in stats.items()},
+        {name: values[away] for name, values in stats.items()},
+    )
+    team_a_probs, _, _ = engine.infer(X)
+    matrix = np.full((n, n), np.nan, dtype=np.float32)
+    matrix[home, away] = team_a_probs
+    return matrix
+
+
+_matrices = OrderedDict()
+_matrices_lock = threading.Lock()
+
+
+def get_pairing_matrix(engine, store, squads, model_version):
+    """
+    pairing_matrix, from the cache when the same squads were scored before
+    against the same data and model
+    Returns (matrix, whether it came from the cache)
+    """
+    key = (store.content_key(), store.revision, model_version, tuple(tuple(squad) for squad in squads))
+    with _matrices_lock:
+        matrix = _matrices.get(key)
+        if matrix is not None:
+            _matrices.move_to_end(key)
+            return matrix, True
+    matrix = pairing_matrix(engine, store, squads)
+    # Shared between requests: never modified in place
+    matrix.flags.writeable = False
+    with _matrices_lock:
+        _matrices[key] = matrix
+        while len(_matrices) > MATRIX_CACHE_SIZE:
+            _matrices.popitem(last=False)
+    return matrix, False
+
+
+def simulate_seasons(matrix, simulations, top_spots=4, relegation_spots=3, seed=None):
+    """
+    Simulate full seasons from a pairing matrix
+    Returns a dict of per-team arrays: title, top and relegation probabilities,
+    expected points and average finishing position (1 = champion)
+    """
+    n = len(matrix)
+    home, away = np.nonzero(~np.eye(n, dtype=bool))
+    win_probs = matrix[home, away].astype(np.float32)
+    # points = 3 * (home wins + away wins) = 3 * (wins @ (H - A) + matches away)
+    home_minus_away = np.zeros((len(home), n), dtype=np.float32)
+    home_minus_away[np.arange(len(home)), home] += 1
+    home_minus_away[np.arange(len(home)), away] -= 1
+    away_matches = np.bincount(away, minlength=n).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    title = np.zeros(n)
+    top = np.zeros(n)
+    relegated = np.zeros(n)
+    points_total = np.zeros(n)
+    position_total = np.zeros(n)
+    ranks = np.arange(n)
+    for start in range(0, simulations, CHUNK_SEASONS):
+        seasons = min(CHUNK_SEASONS, simulations - start)
+        wins = (rng.random((seasons, len(win_probs)), dtype=np.float32) < win_probs).astype(np.float32)
+        points = 3 * (wins @ home_minus_away + away_matches)
+        # Points are multiples of 3, so a jitter below 1 only breaks ties
+        order = np.argsort(-(points + rng.random((seasons, n), dtype=np.float32)), axis=1)
+        positions = np.empty_like(order)
+        np.put_along_axis(positions, order, ranks[None, :], axis=1)
+
+        title += (positions == 0).sum(axis=0)
+        top += (positions < top_spots).sum(axis=0)
+        relegated += (positions >= n - relegation_spots).sum(axis=0)
+        points_total += points.sum(axis=0)
+        position_total += positions.sum(axis=0)
+
+    return {
+        "title": title / simulations,
+        "top": top / simulations,
+        "relegation": relegated / simulations,
+        "expected_points": points_total / simulations,
+        "average_position": position_total / simulations + 1,
+    }
@@ -0,0 +1,117 @@
+"""
+Memory-mapped feature matrix and index arrays shared by all uvicorn workers
+
+With XAI_SHARED_FEATURE_MATRIX=1 the first worker to start writes the feature
+matrix (and its float64 display columns), the match contribution vectors,
+player names, team/position codes, a sorted name index, the team index and
+the player catalog's JSON body as .npy files. Every worker then maps them read-only, so the OS page
+cache holds one copy and per-worker memory no longer grows with the dataset.
+"""
+import json
+import os
+import numpy as np
+from backend.config import DATASET_PATH, SHARED_FEATURE_DIR
+from backend.dataset_cache import source_fingerprint, fingerprint_matches
+
+# Bump when the bundle layout changes
+BUNDLE_FORMAT = 6
+META_FILE = "meta.json"
+ARRAYS = [
+    "feature_matrix", "display_matrix", "contribution_vectors", "player_names", "team_codes", "position_codes",
+    "sorted_names", "sorted_rows", "team_order", "team_offsets", "player_catalog"
+]
+
+
+def bundle_is_fresh(source=DATASET_PATH, bundle_dir=SHARED_FEATURE_DIR):
+    """
+    True if the bundle exists and was written from the current source CSV
+    """
+    from backend.dataset_store import FEATURE_COLUMNS
+    meta_path = bundle_dir / META_FILE
+    if not meta_path.exists():
+        return False
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != BUNDLE_FORMAT or meta.get("feature_columns") != FEATURE_COLUMNS:
+        return False
+    if not all((bundle_dir / f"{name}.npy").exists() for name in ARRAYS):
+        return False
+    return fingerprint_matches(meta.get("source", {}), source)
+
+
+def _save_atomic(path, write):
+    # Workers may race to write the same bundle; each file appears whole
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_bundle(store, source=DATASET_PATH, bundle_dir=SHARED_FEATURE_DIR):
+    """
+    Persist a store's arrays as .npy files (meta.json last, marking it complete)
+    """
+    from backend.catalog import encode_catalog
+    valid = np.fromiter((isinstance(name, str) for name in store.player_names), dtype=bool, count=len(store))
+    # Fixed-width unicode so the names can be memory-mapped too
+    player_names = np.asarray(
+        [name if ok else "" for name, ok in zip(store.player_names, valid)], dtype=str
+    )
+    valid_rows = np.flatnonzero(valid)
+    sorted_names, first = np.unique(player_names[valid_rows], return_index=True)
+    # Team index as one grouped array plus offsets
+    team_sizes = [len(members) for members in store.team_members]
+    team_order = np.concatenate(store.team_members + [np.empty(0, dtype=np.intp)]).astype(np.intp)
+    team_offsets = np.concatenate([[0], np.cumsum(team_sizes)]).astype(np.intp)
+    catalog_body, catalog_etag = encode_catalog(sorted_names.tolist())
+
+    arrays = {
+        "feature_matrix": np.ascontiguousarray(store.feature_matrix, dtype=np.float32),
+        "display_matrix": np.ascontiguousarray(store.display_matrix, dtype=np.float64),
+        "contribution_vectors": np.ascontiguousarray(store.contribution_vectors, dtype=np.float64),
+        "player_names": player_names,
+        "team_codes": np.asarray(store.team_codes),
+        "position_codes": np.asarray(store.position_codes),
+        "sorted_names": sorted_names,
+        "sorted_rows": valid_rows[first].astype(np.int64),
+        "team_order": team_order,
+        "team_offsets": team_offsets,
+        "player_catalog": np.frombuffer(catalog_body, dtype=np.uint8),
+    }
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        def write_array(path, a=array):
+            with open(path, "wb") as f:
+                np.save(f, a, allow_pickle=False)
+        _save_atomic(bundle_dir / f"{name}.npy", write_array)
+
+    meta = {
+        "format": BUNDLE_FORMAT,
+        "source": source_fingerprint(source),
+        "feature_columns": store.feature_columns,
+        "teams": store.teams,
+        "positions": store.positions,
+        "workload_threshold": store.workload_threshold,
+        "player_catalog_etag": catalog_etag,
+        "rows": len(store),
+    }
+
+    def write_meta(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    _save_atomic(bundle_dir / META_FILE, write_meta)
+    print(f"Shared feature bundle written: {bundle_dir} ({len(store)} rows)")
+
+
+def map_bundle(bundle_dir=SHARED_FEATURE_DIR):
+    """
+    Map every bundle array read-only; returns a dict ready for DatasetStore
+    """
+    with open(bundle_dir / META_FILE, encoding="utf-8") as f:
+        meta = json.load(f)
+    arrays = {name: np.load(bundle_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    arrays["teams"] = meta["teams"]
+    arrays["positions"] = meta["positions"]
+    arrays["workload_threshold"] = meta["workload_threshold"]
+    arrays["player_catalog_etag"] = meta["player_catalog_etag"]
+    print(f"Shared feature bundle mapped: {bundle_dir} ({meta['rows']} rows)")
+    return arrays
@@ -0,0 +1,95 @@
+"""
+Best-XI search: the 11 players of a squad with the highest win probability
+against a fixed opponent
+
+Exhaustive search is out of reach (a 35-player squad has billions of XIs),
+so this is a local search over swap moves. A move replaces one XI player by
+a bench player of the same position, so the XI always keeps the position
+balance of the default squad (1 GK, 4 DF, 4 MF, 2 FW where the squad allows).
+Every move from the current XI is scored at once: each candidate's team row
+is the current XI's contribution vector minus the player out plus the player
+in, and the whole block goes through the match model in one pass. The best
+improving move is taken until none is left; then the best XI so far is
+perturbed with random swaps and climbed again, until the time budget runs
+out or PATIENCE restarts in a row find nothing better.
+"""
+import time
+import numpy as np
+from backend.match_features import get_contributions, stats_from_vectors, feature_frame
+
+# Random swaps applied to the best XI before each restart
+PERTURB_SWAPS = 2
+# Restarts in a row without a better XI before the search stops early
+PATIENCE = 50
+# Smallest win-probability gain accepted as an improvement
+MIN_GAIN = 1e-7
+
+
+def optimize_xi(engine, store, pool, positions, start, opponent, time_budget, seed=0):
+    """
+    pool: candidate player names, positions: position code of each candidate,
+    start: initial XI (names from pool), opponent: Team B player names,
+    time_budget: seconds
+    Returns (best XI names, search statistics)
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    contributions = get_contributions(store)
+    vectors = contributions.vectors[[store.row_id(name) for name in pool]]
+    positions = np.asarray(positions)
+    opponent_stats = stats_from_vectors(contributions.side_vectors([opponent]))
+    rng = np.random.default_rng(seed)
+    search = {"candidates_evaluated": 0, "moves": 0, "restarts": 0, "converged": False}
+
+    def score(side_vectors):
+        stats_b = {name: np.repeat(values, len(side_vectors)) for name, values in opponent_stats.items()}
+        probs, _, _ = engine.infer(feature_frame(stats_from_vectors(side_vectors), stats_b))
+        search["candidates_evaluated"] += len(side_vectors)
+        return np.asarray(probs, dtype=np.float64)
+
+    def moves(selected):
+        outs, ins = np.flatnonzero(selected), np.flatnonzero(~selected)
+        o, i = np.nonzero(positions[outs][:, None] == positions[ins][None, :])
+        return outs[o], ins[i]
+
+    def climb(selected, vector, prob):
+        while time.perf_counter() < deadline:
+            outs, ins = moves(selected)
+            if len(outs) == 0:
+                return selected, vector, prob, True
+            candidates = vector + vectors[ins] - vectors[outs]
+            probs = score(candidates)
+            best = int(np.argmax(probs))
+            if probs[best] <= prob + MIN_GAIN:
+                return selected, vector, prob, True
+            selected = selected.copy()
+            selected[outs[best]], selected[ins[best]] = False, True
+            vector, prob = candidates[best], probs[best]
+            search["moves"] += 1
+        return selected, vector, prob, False
+
+    selected = np.isin(np.asarray(pool, dtype=object), list(start))
+    vector = vectors[selected].sum(axis=0)
+    best_selected, _, best_prob, converged = climb(selected, vector, score(vector[None, :])[0])
+    search["converged"] = converged
+    stale = 0
+    while converged and stale < PATIENCE and time.perf_counter() < deadline:
+        if len(moves(best_selected)[0]) == 0:
+            # No swap exists: the XI is forced
+            break
+        selected = best_selected.copy()
+        for _ in range(PERTURB_SWAPS):
+            outs, ins = moves(selected)
+            k = rng.integers(len(outs))
+            selected[outs[k]], selected[ins[k]] = False, True
+        search["restarts"] += 1
+        vector = vectors[selected].sum(axis=0)
+        selected, vector, prob, converged = climb(selected, vector, score(vector[None, :])[0])
+        if prob > best_prob + MIN_GAIN:
+            best_selected, best_prob = selected, prob
+            stale = 0
+        else:
+            stale += 1
+
+    search["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return [name for name, chosen in zip(pool, best_selected) if chosen], search
@@ -0,0 +1,64 @@
+"""
+Default Playing XI selection, computed for every team in one vectorized pass
+
+Strategy: best players by performance score, balanced by position quotas
+(1 GK, 4 DF, 4 MF, 2 FW). Quota slots a team cannot fill go to its best
+remaining players regardless of position.
+"""
+import numpy as np
+import pandas as pd
+
+SQUAD_SIZE = 11
+POSITION_QUOTAS = {"GK": 1, "DF": 4, "MF": 4, "FW": 2}
+
+
+def select_squads(store, row_ids=None, squad_size=SQUAD_SIZE):
+    """
+    Default squad of every team present in row_ids (all rows if None)
+    Returns {team name: [player names]}, best players first within each pass
+    """
+    if row_ids is None:
+        row_ids = np.arange(len(store), dtype=np.intp)
+    row_ids = np.asarray(row_ids, dtype=np.intp)
+
+    quota_by_code = np.array([POSITION_QUOTAS.get(p, 0) for p in store.positions] + [0])
+    order_by_code = np.array(
+        [list(POSITION_QUOTAS).index(p) if p in POSITION_QUOTAS else len(POSITION_QUOTAS)
+         for p in store.positions] + [len(POSITION_QUOTAS)]
+    )
+    position_codes = np.asarray(store.position_codes[row_ids])
+
+    players = pd.DataFrame({
+        "row": row_ids,
+        "team": np.asarray(store.team_codes[row_ids]),
+        "name": np.asarray(store.player_names[row_ids], dtype=object),
+        "performance": store.values("performance_score")[row_ids],
+        "quota": quota_by_code[position_codes],
+        "position_order": order_by_code[position_codes],
+        "position": position_codes,
+    })
+    players = players[(players["team"] >= 0) & players["name"].map(lambda n: isinstance(n, str))]
+    # One entry per player per team (first occurrence), best performers first
+    players = players.drop_duplicates(subset=["team", "name"], keep="first")
+    players = players.sort_values(
+        ["team", "performance", "row"], ascending=[True, False, True], kind="stable"
+    )
+
+    # First pass: top players of each position up to its quota
+    position_rank = players.groupby(["team", "position"], sort=False).cumcount()
+    in_quota = (position_rank < players["quota"]).to_numpy()
+    quota_picks = players[in_quota].assign(rank=position_rank[in_quota])
+    quota_picks = quota_picks.sort_values(["team", "position_order", "rank"], kind="stable")
+    quota_picks = quota_picks[quota_picks.groupby("team", sort=False).cumcount() < squad_size]
+
+    # Second pass: fill the remaining slots with the best players left
+    remaining = squad_size - quota_picks.groupby("team").size()
+    fill = players[~in_quota]
+    fill_rank = fill.groupby("team", sort=False).cumcount()
+    fill = fill[(fill_rank < fill["team"].map(remaining).fillna(squad_size)).to_numpy()]
+
+    picks = pd.concat([quota_picks, fill])
+    squads = {}
+    for code, names in picks.groupby("team", sort=False)["name"]:
+        squads[store.teams[code]] = names.tolist()
+    return squads
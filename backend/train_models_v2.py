@@ -1,6 +1,7 @@
 """
 Enhanced Model Training Pipeline - Production Grade
 Implements XGBoost, feature engineering, hyperparameter tuning, and model versioning
+Run from the repository root: python -m backend.train_models_v2
 """
 import pandas as pd
 import numpy as np
@@ -15,6 +16,8 @@ from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor, XGBClassifier
 import shap
 
+from backend.feature_engineering import engineer_features, fill_missing
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_PATH = BASE_DIR / "data" / "football_master_dataset.csv"
 MODEL_DIR = BASE_DIR / "models"
@@ -33,47 +36,13 @@ print("="*80)
 # ==================== DATA LOADING & ENHANCEMENT ====================
 print("\n📥 Loading and enhancing dataset...")
 df = pd.read_csv(DATA_PATH)
-df = df.fillna(df.select_dtypes(include=[np.number]).mean())
+df = fill_missing(df)
 
 print(f"✅ Loaded {df.shape[0]} players, {df.shape[1]} features")
 
 # ==================== FEATURE ENGINEERING ====================
 print("\n🔧 Feature Engineering...")
 
-def engineer_features(df):
-    """Create enhanced features for better predictions"""
-    df_enhanced = df.copy()
-    
-    # 1. FORM FEATURES (Goals/Assists per game)
-    df_enhanced['goals_per_match'] = df_enhanced['goals'] / (df_enhanced['matches_played'] + 1)
-    df_enhanced['assists_per_match'] = df_enhanced['assists'] / (df_enhanced['matches_played'] + 1)
-    df_enhanced['passes_per_match'] = df_enhanced['passes'] / (df_enhanced['matches_played'] + 1)
-    
-    # 2. INVOLVEMENT FEATURES
-    df_enhanced['total_actions'] = df_enhanced['goals'] + df_enhanced['assists'] + df_enhanced['tackles']
-    df_enhanced['actions_per_90'] = (df_enhanced['total_actions'] * 90) / (df_enhanced['minutes_played'] + 1)
-    
-    # 3. EFFICIENCY FEATURES
-    df_enhanced['shot_accuracy'] = df_enhanced['goals'] / (df_enhanced['shots'] + 1)
-    df_enhanced['pass_success_rate'] = df_enhanced['passes'] / (df_enhanced['passes'] + df_enhanced['shots'] + 1)
-    
-    # 4. INJURY RISK FEATURES
-    df_enhanced['injury_frequency'] = df_enhanced['injuries_last_season'] / (df_enhanced['matches_played'] + 1)
-    df_enhanced['is_injury_prone'] = (df_enhanced['injuries_last_season'] > 1).astype(int)
-    
-    # 5. EXPERIENCE & POSITION FEATURES
-    df_enhanced['is_young'] = (df_enhanced['age'] < 25).astype(int)
-    df_enhanced['is_veteran'] = (df_enhanced['age'] > 32).astype(int)
-    
-    # 6. WORKLOAD FEATURES
-    df_enhanced['high_workload'] = (df_enhanced['minutes_played'] > df_enhanced['minutes_played'].quantile(0.75)).astype(int)
-    df_enhanced['full_season'] = (df_enhanced['matches_played'] > 30).astype(int)
-    
-    # 7. STARTING XI INDICATOR
-    df_enhanced['is_starter'] = df_enhanced['is_starting_xi'].astype(int)
-    
-    return df_enhanced
-
 df = engineer_features(df)
 print(f"✅ Created {df.shape[1] - 15} new features")
 print(f"   Total features: {df.shape[1]}")
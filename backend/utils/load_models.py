@@ -1,21 +1,37 @@
+import hashlib
 import joblib
-import pandas as pd
 from pathlib import Path
-from backend.config import MODEL_PATHS, DATASET_PATH
+from backend.config import (
+    MODEL_PATHS, DATASET_PATH, PRECOMPUTE_PREDICTIONS, MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX
+)
+from backend.dataset_store import load_store, set_store
+from backend import prediction_table
+from backend.micro_batcher import prediction_batcher, explanation_batcher
+from backend.inference_executor import set_model_threads, predict_pool, explain_pool
+from backend.fast_inference import FastPredictor, MatchEngine
+from backend.match_features import MATCH_FEATURES
+
+def model_version(path):
+    """
+    Content hash of a model file: changes whenever the model is retrained
+    """
+    return hashlib.blake2b(Path(path).read_bytes(), digest_size=8).hexdigest()
 
 def load_all_models(app):
     """
-    Load all models, explainers, and dataset into FastAPI app state
+    Load all models and explainers into FastAPI app state, and the dataset into the shared store
     """
     print("Loading dataset and models...")
     
-    # Load dataset
-    app.state.dataset = pd.read_csv(DATASET_PATH)
-    print(f"Dataset loaded: {len(app.state.dataset)} rows")
+    # Load dataset once into the shared store (indexes and feature matrix included)
+    store = set_store(load_store(DATASET_PATH))
+    print(f"Dataset loaded: {len(store)} rows, {len(store.player_index)} players (version {store.version})")
+    print(f"Dataset memory: {sum(store.memory_usage().values()) / 1e6:.2f} MB")
     
     # Load performance model
     if MODEL_PATHS["performance_model"].exists():
-        app.state.performance_model = joblib.load(MODEL_PATHS["performance_model"])
+        app.state.performance_model = set_model_threads(joblib.load(MODEL_PATHS["performance_model"]))
+        app.state.performance_model_version = model_version(MODEL_PATHS["performance_model"])
         print("Performance model loaded")
     else:
         raise FileNotFoundError(f"Performance model not found at {MODEL_PATHS['performance_model']}")
@@ -38,7 +54,8 @@ def load_all_models(app):
     
     # Load injury model
     if MODEL_PATHS["injury_model"].exists():
-        app.state.injury_model = joblib.load(MODEL_PATHS["injury_model"])
+        app.state.injury_model = set_model_threads(joblib.load(MODEL_PATHS["injury_model"]))
+        app.state.injury_model_version = model_version(MODEL_PATHS["injury_model"])
         print("Injury model loaded")
     else:
         raise FileNotFoundError(f"Injury model not found at {MODEL_PATHS['injury_model']}")
@@ -61,7 +78,8 @@ def load_all_models(app):
     
     # Load match model
     if MODEL_PATHS["match_model"].exists():
-        app.state.match_model = joblib.load(MODEL_PATHS["match_model"])
+        app.state.match_model = set_model_threads(joblib.load(MODEL_PATHS["match_model"]))
+        app.state.match_model_version = model_version(MODEL_PATHS["match_model"])
         print("Match model loaded")
     else:
         raise FileNotFoundError(f"Match model not found at {MODEL_PATHS['match_model']}")
@@ -88,3 +106,31 @@ def load_all_models(app):
         ]
     
     print("All models loaded successfully!")
+
+    # Native Booster fast path (falls back to model.predict for non-XGBoost models)
+    for kind in ["performance", "injury"]:
+        predictor = FastPredictor(getattr(app.state, f"{kind}_model"), getattr(app.state, f"{kind}_features"))
+        setattr(app.state, f"{kind}_predictor", predictor)
+        print(f"{kind.title()} model inference: {'native booster' if predictor.native else 'model.predict'}")
+    # Match: one pass for probabilities, winner and (native) SHAP contributions
+    app.state.match_engine = MatchEngine(app.state.match_model, MATCH_FEATURES)
+    print(f"Match model inference: {'native booster' if app.state.match_engine.native else 'model.predict_proba'}")
+
+    # Micro-batchers for concurrent single-player predictions and explanations
+    batching = {"window_ms": MICRO_BATCH_WINDOW_MS, "max_batch": MICRO_BATCH_MAX}
+    for kind in ["performance", "injury"]:
+        explainer = getattr(app.state, f"{kind}_explainer")
+        features = getattr(app.state, f"{kind}_features")
+        predictor = getattr(app.state, f"{kind}_predictor")
+        setattr(app.state, f"{kind}_batcher", prediction_batcher(predictor, executor=predict_pool, **batching))
+        setattr(
+            app.state, f"{kind}_explain_batcher",
+            explanation_batcher(explainer, features, executor=explain_pool, **batching) if explainer is not None else None
+        )
+
+    if PRECOMPUTE_PREDICTIONS:
+        table = prediction_table.enable({
+            "performance": (app.state.performance_predictor, app.state.performance_model_version),
+            "injury": (app.state.injury_predictor, app.state.injury_model_version),
+        })
+        print(f"Prediction table built: {len(table.store)} rows (dataset version {table.dataset_version})")
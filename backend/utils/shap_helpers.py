@@ -168,3 +168,51 @@ def extract_feature_importance(shap_list):
         normalized = {k: float(v) for k, v in importance_dict.items()}
     
     return normalized
+
+
+# -----------------------------------------------------------
+# 5. EXPLAIN A BLOCK OF ROWS (batch endpoints)
+# -----------------------------------------------------------
+def explain_rows(explainer, model_input, feature_names, top_k=5):
+    """
+    SHAP explanations for every row of a block, from one explainer call.
+    Returns one explanation dict per row, shaped like the single-player
+    endpoints' "explanation" field.
+    """
+    n_rows = len(model_input)
+    if explainer is None:
+        return [{
+            "top_features": {},
+            "key_factors": ["SHAP explainer not loaded"],
+            "shap_values": []
+        } for _ in range(n_rows)]
+
+    try:
+        if hasattr(model_input, 'values'):
+            model_input = model_input.values
+        shap_values = explainer.shap_values(np.asarray(model_input))
+        if hasattr(shap_values, "values"):
+            shap_values = shap_values.values
+        if isinstance(shap_values, list):
+            shap_values = shap_values[0]
+        shap_values = np.asarray(shap_values, dtype=np.float64)
+        # (rows, features, outputs): keep the first output
+        if shap_values.ndim > 2:
+            shap_values = shap_values[..., 0]
+
+        explanations = []
+        for row_values in shap_values:
+            shap_list = shap_to_json(row_values, feature_names, top_k=top_k)
+            explanations.append({
+                "top_features": extract_feature_importance(shap_list),
+                "key_factors": format_key_factors(shap_list),
+                "shap_values": shap_list
+            })
+        return explanations
+    except Exception as e:
+        print(f"SHAP explanation error: {e}")
+        return [{
+            "top_features": {},
+            "key_factors": ["SHAP explanation unavailable"],
+            "shap_values": []
+        } for _ in range(n_rows)]
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.api_client import get_players, predict_performance
+from utils.api_client import search_players, predict_performance
 from utils.explanation_helper import translate_feature_name, create_insight_text, format_explanation_text
 import pandas as pd
 import plotly.express as px
@@ -67,11 +67,11 @@ st.markdown(f"""
 
 st.markdown("---")
 
-# Get players list
+# Get players matching the search box (the full list is never downloaded)
 with st.spinner("Loading players..."):
-    players = get_players()
+    players = search_players(st.session_state.get("perf_player_search", ""), limit=50)
 
-if not players:
+if not players and not st.session_state.get("perf_player_search"):
     st.markdown("""
         <div class="error-box">
             <h3>⚠️ Connection Error</h3>
@@ -97,6 +97,12 @@ with col1:
         </div>
     """, unsafe_allow_html=True)
     
+    st.text_input(
+        "Search players",
+        key="perf_player_search",
+        placeholder="Type part of a name, e.g. haaland"
+    )
+
     player = st.selectbox(
         "Choose a player",
         players,
@@ -125,7 +131,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 # Prediction Results
-if predict_btn:
+if predict_btn and player:
     with st.spinner("🔮 Analyzing player performance..."):
         result = predict_performance(player)
     
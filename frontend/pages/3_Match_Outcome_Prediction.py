@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.api_client import get_teams, get_default_squad, get_team_players, get_players, predict_match
+from utils.api_client import get_teams, get_default_squad, get_team_players, predict_match
 from utils.explanation_helper import translate_feature_name, create_insight_text, format_explanation_text
 import pandas as pd
 import plotly.express as px
@@ -102,9 +102,6 @@ if not teams:
     """)
     st.stop()
 
-# Get all players for dropdown
-all_players = get_players()
-
 # Team Selection Section
 st.markdown("""
     <div class="main-card">
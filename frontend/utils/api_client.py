@@ -20,6 +20,19 @@ def get_players() -> List[str]:
         print(f"Error fetching players: {e}")
         return []
 
+def search_players(query: str, limit: int = 20) -> List[str]:
+    """Get player names matching a search query, best matches first"""
+    try:
+        r = requests.get(f"{BASE}/players/search", params={"q": query, "limit": limit}, timeout=5)
+        r.raise_for_status()
+        return r.json()
+    except requests.exceptions.ConnectionError:
+        print(f"Connection Error: Could not connect to backend at {BASE}")
+        return []
+    except Exception as e:
+        print(f"Error searching players: {e}")
+        return []
+
 def get_teams() -> List[str]:
     """Get list of all teams"""
     try: